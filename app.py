@@ -1,137 +1,190 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
 import streamlit as st
-import pandas as pd
-import time
-import plotly.express as px
-from datetime import datetime, timedelta
-from PIL import Image, ImageDraw
-import io
+from datetime import datetime
+from profiling import Profiler
 
 # --- 1. PAGE CONFIG & CSS ---
 st.set_page_config(page_title="Fleet Analytics Portal", layout="wide", initial_sidebar_state="collapsed")
 
-st.markdown("""
-<style>
-    /* Global Styling */
-    .stApp { background-color: #ffffff; color: #1d1d1f; font-family: -apple-system, BlinkMacSystemFont, sans-serif; }
-
-    /* CENTERED TITLE */
-    .centered-title {
-        text-align: center; font-weight: 700; font-size: 3rem; color: #1d1d1f; margin-bottom: 20px;
-    }
-
-    /* --- SIDEBAR NAVIGATION STYLING --- */
-    [data-testid="stSidebar"] button {
-        background-color: transparent !important;
-        color: #1d1d1f !important;
-        border: none !important;
-        text-align: left;
-        padding-left: 20px;
-        font-weight: 600;
-        font-size: 15px;
-        transition: background-color 0.2s ease;
-        width: 100%;
-        margin-bottom: 5px;
-    }
-
-    /* Hover State */
-    [data-testid="stSidebar"] button:hover {
-        background-color: #f5f5f7 !important;
-        color: #0071e3 !important;
-    }
-
-    /* Active/Focus State */
-    [data-testid="stSidebar"] button:active, 
-    [data-testid="stSidebar"] button:focus {
-        background-color: transparent !important;
-        color: #0071e3 !important;
-        outline: none;
-        box-shadow: none;
-    }
-
-    /* CUSTOM HAMBURGER MENU */
-    [data-testid="stSidebarCollapsedControl"] { color: #1d1d1f !important; border: none !important; background-color: transparent !important; }
-    [data-testid="stSidebarCollapsedControl"] svg { display: none !important; }
-    [data-testid="stSidebarCollapsedControl"]::before {
-        content: "☰"; font-size: 28px; font-weight: bold; color: #1d1d1f; margin-top: 5px; display: inline-block;
-    }
-
-    /* COMPACT UPLOAD BOXES */
-    [data-testid='stFileUploader'] {
-        border: 2px dashed #34c759; border-radius: 12px; padding: 10px;
-        background-color: #f9f9f9; transition: all 0.3s ease; min-height: 0px;
-    }
-    [data-testid='stFileUploader']:hover { border-color: #32d74b; transform: scale(1.005); }
-    [data-testid='stFileUploader'] label { font-weight: 600; color: #1d1d1f; font-size: 14px; margin-bottom: 5px; }
-    [data-testid='stFileUploader'] button { border-radius: 15px; border: 1px solid #34c759; color: #34c759; font-size: 12px; padding: 0.25rem 0.75rem; }
-
-    /* Main Process Button */
-    div.stButton > button:first-child {
-        width: 100%; background-color: #0071e3; color: white;
-        border-radius: 980px; padding: 12px 20px; border: none; font-weight: 500;
-        box-shadow: 0 4px 6px rgba(0,113,227,0.2); font-size: 16px;
-    }
-    div.stButton > button:first-child:hover { background-color: #0077ED; transform: scale(1.01); }
-
-    /* Checkbox Styling */
-    .stCheckbox label { font-weight: 600; font-size: 15px; }
-
-    /* Blur Overlay */
-    .blur-overlay {
-        position: fixed; top: 0; left: 0; width: 100vw; height: 100vh;
-        background: rgba(255, 255, 255, 0.75); backdrop-filter: blur(12px);
-        z-index: 99999; display: flex; flex-direction: column;
-        justify-content: center; align-items: center;
-    }
-    .loading-text { font-size: 24px; font-weight: 600; color: #1d1d1f; margin-top: 20px; }
-    .custom-loader {
-        border: 4px solid #f3f3f3; border-top: 4px solid #0071e3;
-        border-radius: 50%; width: 40px; height: 40px; animation: spin 1s linear infinite;
-    }
-    @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
-    @keyframes fadeInUp { from { opacity: 0; transform: translate3d(0, 40px, 0); } to { opacity: 1; transform: translate3d(0, 0, 0); } }
-    .animate-enter { animation: fadeInUp 0.8s cubic-bezier(0.16, 1, 0.3, 1) forwards; }
-
-    /* Sidebar Container */
-    [data-testid="stSidebar"] {
-        background-color: #ffffff;
-        border-right: 1px solid #d2d2d7;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Stylesheet and icon ship with the app (no network fetch). The file is read once per server process;
+# its markup goes out with full reruns only, never with the fragment reruns of a page.
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+
+@st.cache_resource
+def page_style():
+    with open(os.path.join(ASSETS_DIR, "style.css"), encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+st.markdown(page_style(), unsafe_allow_html=True)
 
 # --- 2. INITIALIZE SESSION STATE ---
 if 'page' not in st.session_state: st.session_state.page = "Fleet Dashboard Analysis"
-if 'comm_raw' not in st.session_state: st.session_state.comm_raw = None
-if 'fw_raw' not in st.session_state: st.session_state.fw_raw = None
-if 'all_vendors_list' not in st.session_state: st.session_state.all_vendors_list = []
-if 'detailed_comm_data' not in st.session_state: st.session_state.detailed_comm_data = None
+# Processed results live in the shared result cache; a session only holds a lease on its entry
+if 'result_lease' not in st.session_state: st.session_state.result_lease = None
+if 'perf_records' not in st.session_state: st.session_state.perf_records = []
+if 'comparison' not in st.session_state: st.session_state.comparison = None
+# Background parses of this session's uploads: uploader key -> (file id + columns, future)
+if 'parse_jobs' not in st.session_state: st.session_state.parse_jobs = {}
+
+
+# Stages the app runs around the pipeline's own
+APP_STAGE_LABELS = {'hash_uploads': "Checking uploads", 'wait_uploads': "Finishing upload parsing",
+                    'save_snapshot': "Saving daily snapshot"}
+# Dashboards larger than this are not parsed ahead in the worker pool (read when Process Data runs)
+PREPARSE_MAX_BYTES = int(os.environ.get("FLEET_PREPARSE_MAX_MB", "200")) * 1024 ** 2
+WINDOW_OPTIONS = list(range(1, 31))  # Staleness windows (days) offered on the Communication Windows section
 
 
 # --- 3. HELPER FUNCTIONS ---
-def add_rounded_corners(im, rad):
-    circle = Image.new('L', (rad * 2, rad * 2), 0)
-    draw = ImageDraw.Draw(circle)
-    draw.ellipse((0, 0, rad * 2 - 1, rad * 2 - 1), fill=255)
-    alpha = Image.new('L', im.size, 255)
-    w, h = im.size
-    alpha.paste(circle.crop((0, 0, rad, rad)), (0, 0))
-    alpha.paste(circle.crop((0, rad, rad, rad * 2)), (0, h - rad))
-    alpha.paste(circle.crop((rad, 0, rad * 2, rad)), (w - rad, 0))
-    alpha.paste(circle.crop((rad, rad, rad * 2, rad * 2)), (w - rad, h - rad))
-    im.putalpha(alpha)
-    return im
-
-
-def smart_load(file_obj, required_cols):
-    df = pd.read_excel(file_obj, header=0)
-    df.columns = df.columns.astype(str).str.strip()
-    missing = [col for col in required_cols if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns: {missing}. Found: {list(df.columns)}")
-    return df[required_cols]
-
-
-def render_summary_section(title, raw_df, row_index_col, all_vendors, key_prefix, drop_zeros=False):
+@st.cache_resource
+def get_result_cache():
+    # One cache per server process, shared by every session
+    from cache import ResultCache
+
+    return ResultCache()
+
+
+@st.cache_resource
+def get_snapshot_store():
+    from snapshots import SnapshotStore
+
+    return SnapshotStore()
+
+
+@st.cache_resource
+def get_parse_pool():
+    # Parsing is CPU-bound pure Python, so workers are processes. They are forked: Streamlit runs this
+    # script as __main__, which spawned workers would execute again. Forking a multi-threaded server can
+    # deadlock a child on a lock another thread held at fork time; the workers only run pandas/openpyxl,
+    # and FLEET_PARSE_FORK=0 turns it off. Without fork, threads still parse in the background, just not
+    # on several cores.
+    from ingest import PARSE_WORKERS
+
+    if os.environ.get("FLEET_PARSE_FORK", "1") != "0" and "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("fork"))
+    return ThreadPoolExecutor(max_workers=PARSE_WORKERS)
+
+
+def submit_parse(file_obj, required_cols):
+    from ingest import parse_upload
+
+    args = (parse_upload, file_obj.getvalue(), file_obj.name, list(required_cols))
+    try:
+        return get_parse_pool().submit(*args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory) and took the shared pool with it: start a fresh one
+        get_parse_pool.clear()
+        return get_parse_pool().submit(*args)
+
+
+def parse_in_background(slot, file_obj, required_cols):
+    # Starts parsing as soon as a file is uploaded; later reruns (and Process Data) reuse the running future.
+    # Jobs are (signature, future, attempts); a released job (future None) is read again only if needed.
+    jobs = st.session_state.parse_jobs
+    job = jobs.get(slot)
+    signature = None if file_obj is None else (file_obj.file_id, tuple(required_cols))
+    if job is not None and job[0] != signature:
+        if job[1] is not None: job[1].cancel()
+        del jobs[slot]
+        job = None
+    if file_obj is None:
+        return None
+    if job is not None and job[1] is not None and job[1].done() and job[2] < 2 \
+            and isinstance(job[1].exception(), BrokenProcessPool):
+        # Lost with a broken pool rather than failed on its own: one more try on the new pool
+        jobs[slot] = job = (signature, submit_parse(file_obj, required_cols), job[2] + 1)
+    if job is None:
+        jobs[slot] = job = (signature, submit_parse(file_obj, required_cols), 1)
+    return job[1]
+
+
+def release_parse_jobs():
+    # After a successful run the parsed frames are not kept for the rest of the session
+    jobs = st.session_state.parse_jobs
+    for slot, (signature, _, attempts) in list(jobs.items()):
+        jobs[slot] = (signature, None, attempts)
+
+
+def parse_status(future):
+    if future is None:
+        return "✅ Used by the last run"
+    if not future.done():
+        return "⏳ Parsing..."
+    if future.exception() is not None:
+        return f"❌ {future.exception()}"
+    return f"✅ {len(future.result()):,} rows"
+
+
+def loading_overlay(stage_label, fraction):
+    return (f'<div class="blur-overlay"><div class="custom-loader"></div>'
+            f'<div class="loading-text">Greater things takes time...</div>'
+            f'<div class="loading-stage">{stage_label}</div>'
+            f'<div class="progress-track"><div class="progress-fill" style="width: {fraction:.0%}"></div></div></div>')
+
+
+# Derived artefacts of a summary section, shared across reruns and sessions. `input_key` is the result
+# cache key (content digests of the uploads), so the frame itself is not hashed (leading underscore).
+# The table is cache_data: every session gets its own copy, and its Styler is built per run because
+# st.data_editor computes on it (a shared Styler is not safe across sessions).
+@st.cache_data(max_entries=64, show_spinner=False)
+def section_table(input_key, key_prefix, _raw_df, selected_vendors, drop_zeros):
+    from views import summary_table
+
+    return summary_table(_raw_df, list(selected_vendors), drop_zeros)
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def section_chart(input_key, key_prefix, _table_df, selected_vendors, drop_zeros, row_index_col, sort_order):
+    from views import build_figure, chart_data
+
+    chart_df = chart_data(_table_df, row_index_col)
+    return chart_df, build_figure(chart_df, row_index_col, sort_order)
+
+
+# Export files of a result, built on the first download and then served from disk to every session
+@st.cache_resource(max_entries=8, show_spinner=False)
+def detailed_export_file(input_key, _result):
+    from export import detailed_csv
+
+    return detailed_csv(_result)
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def bundle_export_file(input_key, fmt, _result):
+    from export import export_bundle
+
+    return export_bundle(_result, fmt)
+
+
+# Parts left out of the bundles built so far (charts need a headless browser). Downloads are built
+# outside the script run, so later runs of the page read what happened from here.
+@st.cache_resource
+def bundle_notes():
+    return {}
+
+
+def bundle_bytes(input_key, fmt, result):
+    bundle = bundle_export_file(input_key, fmt, result)
+    notes = bundle_notes()
+    notes[(input_key, fmt)] = bundle.skipped
+    while len(notes) > 8:
+        del notes[next(iter(notes))]
+    return bundle.read_bytes()
+
+
+@st.fragment
+def render_summary_section(title, raw_df, row_index_col, all_vendors, key_prefix, input_key, drop_zeros=False):
+    # A fragment: its widgets rerun only this section, and unchanged filters are served from the memo.
+    # Its profiler is created here so fragment reruns are timed too (and shown below the section).
+    from export import chart_png
+    from views import SORT_OPTIONS, build_figure, chart_data, style_summary
+
     st.subheader(title)
 
     # Vendor Filter
@@ -169,29 +222,21 @@ def render_summary_section(title, raw_df, row_index_col, all_vendors, key_prefix
         return
 
     # Filter Data
-    filtered_df = raw_df[selected_vendors].copy()
-    if drop_zeros:
-        row_sums = filtered_df.sum(axis=1)
-        filtered_df = filtered_df[row_sums > 0]
-
-    filtered_df.loc['Total'] = filtered_df.sum(axis=0)
-
-    # Table
-    styled_df = filtered_df.style.set_properties(**{
-        'background-color': 'white', 'color': '#1d1d1f', 'border-bottom': '1px solid #d2d2d7',
-        'font-family': 'sans-serif', 'font-size': '14px', 'text-align': 'center'
-    }).set_table_styles([
-        {'selector': 'th', 'props': [('background-color', '#F5F5F7'), ('color', '#1d1d1f'), ('font-weight', '600'),
-                                     ('border-bottom', '2px solid #d2d2d7'), ('padding', '12px')]},
-        {'selector': 'td', 'props': [('padding', '10px')]},
-        {'selector': 'tr:last-child',
-         'props': [('font-weight', 'bold'), ('background-color', '#f2f2f7'), ('color', '#0071e3')]}
-    ])
-
-    edited_df = st.data_editor(styled_df, use_container_width=True, num_rows="fixed", key=f"{key_prefix}_table")
-    st.download_button(f"Download Summary CSV", data=edited_df.to_csv().encode('utf-8'),
-                       file_name=f'{key_prefix}_summary.csv',
-                       mime='text/csv')
+    profiler = Profiler('render', section=key_prefix)
+    vendors_key = tuple(selected_vendors)
+    with profiler.stage(f"{key_prefix}_table", rows_in=len(raw_df)) as rec:
+        filtered_df = section_table(input_key, key_prefix, raw_df, vendors_key, drop_zeros)
+
+        # Table
+        edited_df = st.data_editor(style_summary(filtered_df), use_container_width=True, num_rows="fixed", key=f"{key_prefix}_table")
+        st.download_button(f"Download Summary CSV", data=lambda: edited_df.to_csv().encode('utf-8'),
+                           file_name=f'{key_prefix}_summary.csv',
+                           mime='text/csv', on_click="ignore")
+        rec['rows_out'] = len(edited_df)
+
+    # Hand edits in the table feed the chart; only the untouched table is memoized
+    edits = st.session_state.get(f"{key_prefix}_table") or {}
+    edited = any(edits.get(k) for k in ('edited_rows', 'added_rows', 'deleted_rows'))
 
     # Chart
     st.markdown("##### Visual Insights")
@@ -201,65 +246,113 @@ def render_summary_section(title, raw_df, row_index_col, all_vendors, key_prefix
     with sort_col1:
         sort_order = st.selectbox(
             "Rearrange Chart By:",
-            ["Default (Vendor Name)", "Total Count (High → Low)", "Total Count (Low → High)"],
+            SORT_OPTIONS,
             key=f"sort_{key_prefix}"
         )
 
     try:
-        chart_source = edited_df.drop(index='Total')
-        chart_data = chart_source.reset_index().melt(id_vars=row_index_col, var_name='Device Vendor',
-                                                     value_name='Count')
-
-        APPLE_COLORS = ['#34c759', '#ff3b30', '#ff9f0a', '#0071e3', '#af52de', '#5856d6', '#ff2d55']
-
-        fig = px.bar(chart_data, x='Device Vendor', y='Count', color=row_index_col, barmode='group', text_auto=True,
-                     color_discrete_sequence=APPLE_COLORS)
-
-        # Apply Sorting
-        if sort_order == "Total Count (High → Low)":
-            fig.update_layout(xaxis={'categoryorder': 'total descending'})
-        elif sort_order == "Total Count (Low → High)":
-            fig.update_layout(xaxis={'categoryorder': 'total ascending'})
-
-        # --- UPDATED LAYOUT: NORMAL HEIGHT ON WEB, BIG MARGINS ---
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="-apple-system, sans-serif", size=14, color="#1d1d1f"),
-            legend=dict(
-                orientation="h",
-                yanchor="top",
-                y=-0.2,  # Moved Legend below
-                xanchor="center",
-                x=0.5
-            ),
-            # Increase margins to prevent cutting (especially bottom)
-            margin=dict(l=40, r=40, t=40, b=100)
-        )
-
-        fig.update_traces(marker_cornerradius=10)
+        with profiler.stage(f"{key_prefix}_chart", rows_in=len(edited_df)) as rec:
+            if edited:
+                chart_df = chart_data(edited_df, row_index_col)
+                fig = build_figure(chart_df, row_index_col, sort_order)
+            else:
+                chart_df, fig = section_chart(input_key, key_prefix, filtered_df, vendors_key, drop_zeros,
+                                              row_index_col, sort_order)
 
-        st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True)
+            rec['rows_out'] = len(chart_df)
 
-        # --- ROUNDED IMAGE DOWNLOAD (High Res: 1800x1000) ---
-        img_bytes = fig.to_image(format="png", width=1800, height=1000, scale=1)
-        bg = Image.new("RGB", Image.open(io.BytesIO(img_bytes)).size, (255, 255, 255))
-        bg.paste(Image.open(io.BytesIO(img_bytes)), mask=Image.open(io.BytesIO(img_bytes)).split()[3])
-        final_buffer = io.BytesIO()
-        add_rounded_corners(bg.convert("RGBA"), 30).save(final_buffer, format="PNG")
-        st.download_button(f"Download Graph", data=final_buffer.getvalue(), file_name=f"{key_prefix}_chart.png",
-                           mime="image/png")
+        # --- ROUNDED IMAGE DOWNLOAD (rendered only when clicked, memoized per figure) ---
+        st.download_button(f"Download Graph", data=lambda: chart_png(fig), file_name=f"{key_prefix}_chart.png",
+                           mime="image/png", on_click="ignore")
 
     except Exception as e:
         st.warning(f"Chart error: {e}")
 
+    with st.expander("⏱️ Section timings (this rerun)"):
+        st.dataframe(profiler.records, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def render_contact_windows(contact_index):
+    # Communication summary for any as-of date and staleness window, from the per-vendor contact
+    # histogram of the processed result (no reprocessing)
+    from processing import COMM_WINDOW_DAYS
+    from views import style_summary, summary_table, window_comparison
+
+    st.subheader("🕒 Communication Windows")
+    contact_range = contact_index.contact_range()
+    if contact_range is None:
+        st.info("No fleet has a usable Last Updated date.")
+        return
+
+    col_day, col_window, col_compare = st.columns([1, 2, 2])
+    with col_day:
+        as_of = st.date_input("As of:", value=datetime.now().date(), key="window_as_of")
+    with col_window:
+        window_days = st.select_slider("Communicated within (days):", options=WINDOW_OPTIONS,
+                                       value=COMM_WINDOW_DAYS, key="window_days")
+    with col_compare:
+        compare = st.multiselect("Compare with windows (days):", WINDOW_OPTIONS, key="window_compare")
+    st.caption(f"Last contacts run from {contact_range[0]:%d %b %Y} to {contact_range[1]:%d %b %Y}. "
+               f"Fleets seen on the as-of date count as within 1 day.")
+
+    table = contact_index.communication_summary(as_of, window_days)
+    table = summary_table(table, list(table.columns))
+    st.dataframe(style_summary(table), use_container_width=True)
+
+    # Side by side: communicating fleets and their share per vendor under each window
+    windows = sorted({window_days, *compare})
+    if len(windows) > 1:
+        st.markdown("##### Windows Side by Side")
+        comparison = window_comparison({days: contact_index.communication_summary(as_of, days) for days in windows})
+        st.dataframe(comparison.style.format("{:.1%}", subset=[c for c in comparison.columns if c.endswith('%')]),
+                     use_container_width=True)
+
+
+@st.fragment
+def render_firmware_compliance(firmware_index, firmware_fleets):
+    # Rollout queries answered from the version-ordered firmware index of the processed result
+    from comparison import PAGE_SIZE
+
+    st.subheader("🎯 Firmware Compliance")
+    if not firmware_index.versions:
+        st.info("No fleet has a firmware version.")
+        return
+
+    col_target, col_vendors = st.columns([1, 3])
+    with col_target:
+        # Newest first; a version not seen in the export can be typed in as well
+        target = st.selectbox("Target version:", firmware_index.versions[::-1], key="fw_target",
+                              accept_new_options=True)
+    with col_vendors:
+        vendors = st.multiselect("Vendors:", list(firmware_index.vendors), key="fw_target_vendors",
+                                 placeholder="All vendors")
+
+    report = firmware_index.below_target(target).join(firmware_index.latest_share().drop(columns='Fleets'))
+    if vendors:
+        report = report.loc[vendors]
+    st.dataframe(report.style.format({'Share Below': '{:.1%}', 'Share On Latest': '{:.1%}'}),
+                 use_container_width=True)
+
+    outdated = firmware_index.outdated_fleets(firmware_fleets, target, vendors or None)
+    if outdated is None:
+        st.caption("Streaming runs keep firmware counts only. Process without streaming mode to list the fleets.")
+        return
+    st.markdown(f"##### Fleets below {target} ({len(outdated):,})")
+    st.dataframe(outdated.head(PAGE_SIZE), use_container_width=True, hide_index=True)
+    if len(outdated) > PAGE_SIZE:
+        st.caption(f"Showing the first {PAGE_SIZE:,}; the download has all of them.")
+    st.download_button("Download Outdated Fleets (CSV)", data=lambda: outdated.to_csv(index=False).encode('utf-8'),
+                       file_name=f"Fleets_Below_{target}.csv", mime="text/csv", on_click="ignore")
+
 
 # --- 4. SIDEBAR NAVIGATION BUTTONS ---
 def set_page(page_name):
     st.session_state.page = page_name
 
 
-st.sidebar.image("https://img.icons8.com/ios-filled/100/0071e3/truck.png", width=50)
+st.sidebar.image(os.path.join(ASSETS_DIR, "truck.svg"), width=50)
 st.sidebar.write("### Navigation")
 
 # Navigation Buttons
@@ -269,13 +362,23 @@ if st.sidebar.button("Fleet Dashboard Analysis", use_container_width=True):
 if st.sidebar.button("Master Data Comparison", use_container_width=True):
     st.session_state.page = "Master Data Comparison"
 
+if st.sidebar.button("Trends", use_container_width=True):
+    st.session_state.page = "Trends"
+
 # =========================================================
 # PAGE 1: FLEET DASHBOARD ANALYSIS
 # =========================================================
-if st.session_state.page == "Fleet Dashboard Analysis":
-
+# Each page is a fragment: its widgets rerun the page alone, not the stylesheet, sidebar or other pages
+@st.fragment
+def render_dashboard_page():
     st.markdown('<h1 class="centered-title">Fleet Dashboard Analysis</h1>', unsafe_allow_html=True)
 
+    # Data modules (and pandas with them) load once the page header is out
+    from cache import result_key
+    from export import BUNDLE_FORMATS
+    from ingest import FLEET_COLUMN, UPLOAD_TYPES, dashboard_columns
+    from processing import STAGE_LABELS, planned_stages, run_analysis, run_analysis_streaming
+
     # --- 1. ANALYSIS SELECTION ---
     st.write("### 1. Select Analysis")
 
@@ -309,13 +412,42 @@ if st.session_state.page == "Fleet Dashboard Analysis":
 
     # --- 2. FILE UPLOADS ---
     st.write("### 2. Upload Data")
+    # Chosen before uploading: in streaming mode the dashboard is never parsed whole
+    streaming = st.checkbox("Streaming mode (large exports, lower memory)", key="streaming",
+                            help="Reads the Fleet Dashboard in chunks and keeps the detailed fleet list on disk.")
     col_up1, col_up2 = st.columns(2)
     with col_up1:
-        file_dashboard = st.file_uploader("Fleet Dashboard (Req)", type=['xlsx'], key="f1")
-        file_rebody = st.file_uploader("Rebody File", type=['xlsx'], key="f2")
+        file_dashboard = st.file_uploader("Fleet Dashboard (Req)", type=UPLOAD_TYPES, key="f1")
+        status_dashboard = st.empty()
+        file_rebody = st.file_uploader("Rebody File", type=UPLOAD_TYPES, key="f2")
+        status_rebody = st.empty()
     with col_up2:
-        file_fm = st.file_uploader("Field Maintenance", type=['xlsx'], key="f3")
-        file_sheddown = st.file_uploader("Sheddown File", type=['xlsx'], key="f4")
+        file_fm = st.file_uploader("Field Maintenance", type=UPLOAD_TYPES, key="f3")
+        status_fm = st.empty()
+        file_sheddown = st.file_uploader("Sheddown File", type=UPLOAD_TYPES, key="f4")
+        status_sheddown = st.empty()
+
+    # Each upload starts parsing in the worker pool right away, in parallel with the others.
+    # Streaming mode reads the dashboard itself in chunks, and very large dashboards are only read
+    # when Process Data runs, so neither is parsed ahead.
+    preparse_dashboard = (file_dashboard is not None and not streaming
+                          and file_dashboard.size <= PREPARSE_MAX_BYTES)
+    if file_dashboard is not None and not streaming and not preparse_dashboard:
+        status_dashboard.caption("Large file: read when Process Data runs (consider Streaming mode)")
+    parse_targets = [
+        ("f1", "Fleet Dashboard", file_dashboard if preparse_dashboard else None, dashboard_columns(run_comm, run_fw),
+         status_dashboard),
+        ("f2", "Rebody File", file_rebody if run_comm else None, [FLEET_COLUMN], status_rebody),
+        ("f3", "Field Maintenance", file_fm if run_comm else None, [FLEET_COLUMN], status_fm),
+        ("f4", "Sheddown File", file_sheddown if run_comm else None, [FLEET_COLUMN], status_sheddown),
+    ]
+    parse_futures = {}
+    for slot, label, file_obj, required_cols, status in parse_targets:
+        future = parse_in_background(slot, file_obj, required_cols)
+        if future is not None:
+            parse_futures[slot] = (label, future)
+        if file_obj is not None:
+            status.caption(parse_status(future))
 
     st.markdown("---")
 
@@ -331,133 +463,295 @@ if st.session_state.page == "Fleet Dashboard Analysis":
         if missing:
             st.error(f"Please upload: {', '.join(missing)}")
         else:
+            as_of = datetime.now().date()
+            uploads = [file_dashboard] + ([file_rebody, file_fm, file_sheddown] if run_comm else [None, None, None])
+            result_cache = get_result_cache()
+            stages = ['hash_uploads', 'wait_uploads'] + planned_stages(run_comm, run_fw, streaming) + ['save_snapshot']
             placeholder = st.empty()
-            placeholder.markdown(
-                '<div class="blur-overlay"><div class="custom-loader"></div><div class="loading-text">Greater things takes time...</div></div>',
-                unsafe_allow_html=True)
-            time.sleep(1.5)
 
-            try:
-                st.session_state.comm_raw = None
-                st.session_state.fw_raw = None
-                st.session_state.all_vendors_list = []
-                st.session_state.detailed_comm_data = None  # Reset Detailed Data
-
-                FLEET_COLUMN = 'Fleet Number'
-                VENDOR_COLUMN = 'Device Vendor'
-
-                # --- 1. PRE-LOAD TO GET VENDORS ---
-                df_dash_raw = pd.read_excel(file_dashboard, header=0)
-                df_dash_raw.columns = df_dash_raw.columns.astype(str).str.strip()
-                if VENDOR_COLUMN in df_dash_raw.columns:
-                    unique_vendors = sorted(
-                        df_dash_raw[VENDOR_COLUMN].dropna().astype(str).str.strip().unique().tolist())
-                    st.session_state.all_vendors_list = unique_vendors
-                else:
-                    raise ValueError(f"Column '{VENDOR_COLUMN}' not found in Dashboard.")
-
-                # --- 2. MODULE: COMMUNICATION ---
-                if run_comm:
-                    CURRENT_DATE = datetime.now().date()
-                    PREVIOUS_DATE = (CURRENT_DATE - timedelta(days=1))
-                    DATE_COLUMN = 'Last Updated'
-                    PRIORITY_MAP = {'Sheddown': 3, 'Field Maintenance': 2, 'Rebody Renovation': 1}
-                    STATUS_ORDER = ['Communication', 'No Communication', 'Rebody Renovation', 'Field Maintenance',
-                                    'Sheddown']
-
-                    df_dash_comm = smart_load(file_dashboard, [FLEET_COLUMN, VENDOR_COLUMN, DATE_COLUMN])
-                    df_rebody = smart_load(file_rebody, [FLEET_COLUMN]).assign(Category='Rebody Renovation')
-                    df_fm = smart_load(file_fm, [FLEET_COLUMN]).assign(Category='Field Maintenance')
-                    df_sheddown = smart_load(file_sheddown, [FLEET_COLUMN]).assign(Category='Sheddown')
-
-                    for df in [df_dash_comm, df_rebody, df_fm, df_sheddown]:
-                        df[FLEET_COLUMN] = df[FLEET_COLUMN].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-
-                    df_all_red = pd.concat([df_rebody, df_fm, df_sheddown], ignore_index=True)
-                    df_all_red['Priority_Score'] = df_all_red['Category'].map(PRIORITY_MAP)
-                    df_red_master = df_all_red.sort_values('Priority_Score', ascending=False).drop_duplicates(
-                        subset=[FLEET_COLUMN], keep='first')
-
-                    df_dash_comm[DATE_COLUMN] = pd.to_datetime(df_dash_comm[DATE_COLUMN], errors='coerce')
-                    df_dash_comm['Last Updated Date'] = df_dash_comm[DATE_COLUMN].dt.date
-                    is_comm = (df_dash_comm['Last Updated Date'] == CURRENT_DATE) | (
-                            df_dash_comm['Last Updated Date'] == PREVIOUS_DATE)
-
-                    df_merged = pd.merge(df_dash_comm, df_red_master[[FLEET_COLUMN, 'Category']], on=FLEET_COLUMN,
-                                         how='left')
-                    df_merged['Final Status'] = df_merged.apply(lambda row: 'Communication' if is_comm[row.name] else (
-                        row['Category'] if pd.notna(row['Category']) else 'No Communication'), axis=1)
-
-                    # --- SAVE DETAILED DATA FOR DOWNLOAD ---
-                    detailed_export = df_merged[[FLEET_COLUMN, 'Final Status', VENDOR_COLUMN]].copy()
-                    detailed_export.columns = ['Fleet Number', 'Status', 'Vendor']
-                    st.session_state.detailed_comm_data = detailed_export
-
-                    comm_summ = pd.pivot_table(df_merged, index='Final Status', columns=VENDOR_COLUMN, aggfunc='size',
-                                               fill_value=0)
-                    comm_summ = comm_summ.reindex(STATUS_ORDER, fill_value=0)
-                    st.session_state.comm_raw = comm_summ
-
-                # --- 3. MODULE: FIRMWARE ---
-                if run_fw:
-                    FW_COLUMN = 'Firmware Version'
-                    file_dashboard.seek(0)
-                    df_dash_fw = smart_load(file_dashboard, [VENDOR_COLUMN, FW_COLUMN])
-
-                    fw_summ = pd.pivot_table(df_dash_fw, index=FW_COLUMN, columns=VENDOR_COLUMN, aggfunc='size',
-                                             fill_value=0)
-                    st.session_state.fw_raw = fw_summ
+            # Progress is driven by the pipeline's own stage events
+            def show_progress(event, stage, profiler):
+                if event == 'start':
+                    label = APP_STAGE_LABELS.get(stage) or STAGE_LABELS[stage]
+                    placeholder.markdown(loading_overlay(label, len(profiler.records) / len(stages)),
+                                         unsafe_allow_html=True)
+
+            profiler = Profiler('process', on_stage=show_progress, track_memory=st.session_state.get('perf_memory', False),
+                                modules=[m for m, on in (('comm', run_comm), ('fw', run_fw)) if on])
+            st.session_state.result_lease = None  # Reset Results
 
+            try:
+                with profiler.stage('hash_uploads'):
+                    cache_key = result_key(uploads, (run_comm, run_fw, streaming), as_of)
+                    # Same uploads, modules and day as an earlier run (any session): reuse its results
+                    result = result_cache.get(cache_key)
+                cached = result is not None
+                if not cached:
+                    # The button only waits on the parses already running; failures are listed per file
+                    with profiler.stage('wait_uploads'):
+                        wait([future for _, future in parse_futures.values()])
+                    failed = [f"{label}: {future.exception()}" for label, future in parse_futures.values()
+                              if future.exception() is not None]
+                    if failed:
+                        raise ValueError("Could not read:\n" + "\n".join(f"- {msg}" for msg in failed))
+                    parsed = [parse_futures[slot][1] if slot in parse_futures else file_obj
+                              for slot, file_obj in zip(("f1", "f2", "f3", "f4"), uploads)]
+                    analyze = run_analysis_streaming if streaming else run_analysis
+                    result = analyze(*parsed, run_comm, run_fw, as_of, profiler=profiler)
+                    result_cache.put(cache_key, result)
+                    # Every fresh run lands in the day's snapshot (re-runs replace it)
+                    try:
+                        with profiler.stage('save_snapshot'):
+                            get_snapshot_store().ingest(as_of, result)
+                    except Exception as e:
+                        st.warning(f"Snapshot not saved: {e}")
+                st.session_state.result_lease = result_cache.lease(cache_key)
+                if st.session_state.result_lease is None:
+                    raise RuntimeError("The result was evicted from the result cache before it could be shown. "
+                                       "Please process the data again.")
+                release_parse_jobs()
+                profiler.log('run', seconds=profiler.total_seconds(), cached=cached)
             except Exception as e:
+                profiler.log('run', seconds=profiler.total_seconds(), error=str(e))
                 st.error(f"❌ Error: {e}")
 
+            st.session_state.perf_records = profiler.records
             placeholder.empty()
 
     # --- 4. DISPLAY RESULTS ---
+    results = {}
+    if st.session_state.result_lease is not None:
+        results = get_result_cache().get(st.session_state.result_lease.key, record=False)
+        if results is None:
+            st.session_state.result_lease = None
+            results = {}
+            st.info("Cached results have expired. Please process the data again.")
+    comm_raw = results.get('comm_raw')
+    fw_raw = results.get('fw_raw')
+    all_vendors_list = results.get('all_vendors_list', [])
+    detailed_comm_data = results.get('detailed_comm_data')
+    results_key = st.session_state.result_lease.key if st.session_state.result_lease is not None else None
+    detailed_comm_file = results.get('detailed_comm_file')
+    contact_index = results.get('contact_index')
+    firmware_index = results.get('firmware_index')
+    firmware_fleets = results.get('firmware_fleets')
+
     with st.container():
-        if st.session_state.comm_raw is not None or st.session_state.fw_raw is not None:
+        if comm_raw is not None or fw_raw is not None:
             st.markdown('<div class="animate-enter">', unsafe_allow_html=True)
             st.success("Analysis Complete")
 
-            if st.session_state.comm_raw is not None:
+            if comm_raw is not None:
                 render_summary_section(
                     "📡 Communication Status",
-                    st.session_state.comm_raw,
+                    comm_raw,
                     "Final Status",
-                    st.session_state.all_vendors_list,
+                    all_vendors_list,
                     "comm",
-                    drop_zeros=False
+                    drop_zeros=False,
+                    input_key=results_key
                 )
 
                 # --- NEW DETAILED DOWNLOAD BUTTON ---
-                if st.session_state.detailed_comm_data is not None:
-                    csv_detailed = st.session_state.detailed_comm_data.to_csv(index=False).encode('utf-8')
+                if detailed_comm_data is not None or detailed_comm_file is not None:
                     st.download_button(
                         label="📥 Download Detailed Fleet List (CSV)",
-                        data=csv_detailed,
+                        data=lambda: detailed_export_file(results_key, results).read_bytes(),
                         file_name="Detailed_Fleet_Status.csv",
                         mime="text/csv",
-                        help="Download the full list of fleets with their individual status."
+                        help="Download the full list of fleets with their individual status.",
+                        on_click="ignore"
                     )
 
-            if st.session_state.comm_raw is not None and st.session_state.fw_raw is not None:
+                if contact_index is not None:
+                    st.markdown("---")
+                    render_contact_windows(contact_index)
+
+            if comm_raw is not None and fw_raw is not None:
                 st.markdown("---")
 
-            if st.session_state.fw_raw is not None:
+            if fw_raw is not None:
                 render_summary_section(
                     "⚙️ Firmware Version Status",
-                    st.session_state.fw_raw,
+                    fw_raw,
                     "Firmware Version",
-                    st.session_state.all_vendors_list,
+                    all_vendors_list,
                     "fw",
-                    drop_zeros=True
+                    drop_zeros=True,
+                    input_key=results_key
                 )
 
+                if firmware_index is not None:
+                    st.markdown("---")
+                    render_firmware_compliance(firmware_index, firmware_fleets)
+
+            # --- EXPORT ALL ---
+            st.markdown("---")
+            col_fmt, col_export = st.columns([3, 1])
+            with col_fmt:
+                bundle_fmt = st.selectbox("Export all as:", list(BUNDLE_FORMATS), key="bundle_fmt",
+                                          format_func=lambda fmt: BUNDLE_FORMATS[fmt][0])
+            with col_export:
+                st.write("")
+                st.write("")
+                _, extension, mime = BUNDLE_FORMATS[bundle_fmt]
+                st.download_button(
+                    label="📦 Export all",
+                    data=lambda: bundle_bytes(results_key, bundle_fmt, results),
+                    file_name=f"Fleet_Export.{extension}",
+                    mime=mime,
+                    help="Detailed fleet list, both summaries (all vendors) and their charts in one file. "
+                         "Charts need a headless Chrome on the server; anything left out is listed in the file.",
+                    on_click="ignore"
+                )
+            skipped = bundle_notes().get((results_key, bundle_fmt))
+            if skipped:
+                st.warning("The last export left out: " + "; ".join(skipped))
+
             st.markdown('</div>', unsafe_allow_html=True)
 
+    # --- 5. PERFORMANCE ---
+    with st.expander("⏱️ Performance"):
+        st.checkbox("Track peak memory on the next run (slower)", key="perf_memory")
+        if st.session_state.perf_records:
+            st.caption("Last Process Data run")
+            st.dataframe(st.session_state.perf_records, use_container_width=True, hide_index=True)
+        st.caption("Each summary section shows its own timings, refreshed whenever it reruns.")
+
 # =========================================================
 # PAGE 2: MASTER DATA COMPARISON
 # =========================================================
-elif st.session_state.page == "Master Data Comparison":
+@st.fragment
+def render_comparison_page():
     st.markdown('<h1 class="centered-title">Master Data Comparison</h1>', unsafe_allow_html=True)
-    st.info("🚧 Module coming soon!")
\ No newline at end of file
+
+    # Data modules (and pandas with them) load once the page header is out
+    from comparison import COMPARE_STAGE_LABELS, DIFF_CATEGORIES, run_comparison
+    from ingest import UPLOAD_TYPES
+
+    # --- 1. FILE UPLOADS ---
+    st.write("### 1. Upload Data")
+    col_m1, col_m2 = st.columns(2)
+    with col_m1:
+        file_master = st.file_uploader("Master Fleet Register", type=UPLOAD_TYPES, key="m1")
+    with col_m2:
+        file_master_dash = st.file_uploader("Fleet Dashboard", type=UPLOAD_TYPES, key="m2")
+
+    st.markdown("---")
+
+    # --- 2. COMPARE BUTTON ---
+    if st.button("Compare"):
+        if not file_master or not file_master_dash:
+            st.error("Please upload both the Master Fleet Register and the Fleet Dashboard")
+        else:
+            placeholder = st.empty()
+
+            def show_compare_progress(event, stage, profiler):
+                if event == 'start':
+                    placeholder.markdown(loading_overlay(COMPARE_STAGE_LABELS[stage],
+                                                         len(profiler.records) / len(COMPARE_STAGE_LABELS)),
+                                         unsafe_allow_html=True)
+
+            profiler = Profiler('compare', on_stage=show_compare_progress)
+            st.session_state.comparison = None
+            try:
+                st.session_state.comparison = run_comparison(file_master, file_master_dash, profiler=profiler)
+                profiler.log('run', seconds=profiler.total_seconds())
+            except Exception as e:
+                profiler.log('run', seconds=profiler.total_seconds(), error=str(e))
+                st.error(f"❌ Error: {e}")
+            placeholder.empty()
+
+    # --- 3. DISPLAY RESULTS ---
+    comparison = st.session_state.comparison
+    if comparison is not None:
+        st.markdown('<div class="animate-enter">', unsafe_allow_html=True)
+        st.success("Comparison Complete")
+
+        # Counts come straight from the diff; detail rows are built one page at a time
+        counts = comparison.counts()
+        metric_cols = st.columns(len(DIFF_CATEGORIES))
+        for col, (category, label) in zip(metric_cols, DIFF_CATEGORIES.items()):
+            col.metric(label, "n/a" if counts[category] is None else f"{counts[category]:,}")
+
+        available = [c for c in DIFF_CATEGORIES if counts[c]]
+        if available:
+            category = st.selectbox("Details", available, format_func=lambda c: DIFF_CATEGORIES[c],
+                                    key="diff_category")
+            pages = comparison.page_count(category)
+            page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, step=1,
+                                   key=f"diff_page_{category}")
+            st.dataframe(comparison.details(category, page - 1), use_container_width=True, hide_index=True)
+            st.download_button(
+                label=f"📥 Download {DIFF_CATEGORIES[category]} (CSV)",
+                data=lambda: comparison.full(category).to_csv(index=False).encode('utf-8'),
+                file_name=f"{category}.csv",
+                mime="text/csv",
+                on_click="ignore"
+            )
+        else:
+            st.info("No differences found.")
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+# =========================================================
+# PAGE 3: TRENDS
+# =========================================================
+@st.fragment
+def render_trends_page():
+    st.markdown('<h1 class="centered-title">Trends</h1>', unsafe_allow_html=True)
+
+    # Data modules (and pandas with them) load once the page header is out
+    from snapshots import COMM_ROLLUP, FW_ROLLUP, TREND_FREQUENCIES
+    from views import build_trend_figure
+
+    # Reads only the per-day rollups in the snapshot store; no workbook is parsed here
+    store = get_snapshot_store()
+    snapshot_days = sorted(set(store.days(COMM_ROLLUP)) | set(store.days(FW_ROLLUP)))
+    if not snapshot_days:
+        st.info("No snapshots yet. Process a day on Fleet Dashboard Analysis (or backfill with batch.py) first.")
+    else:
+        col_t1, col_t2 = st.columns([2, 1])
+        with col_t1:
+            if len(snapshot_days) > 1:
+                since, until = st.slider("Date range", min_value=snapshot_days[0], max_value=snapshot_days[-1],
+                                         value=(snapshot_days[0], snapshot_days[-1]), key="trend_range")
+            else:
+                since = until = snapshot_days[0]
+        with col_t2:
+            frequency = st.radio("Granularity", list(TREND_FREQUENCIES), index=1, horizontal=True, key="trend_freq")
+        freq = TREND_FREQUENCIES[frequency]
+
+        comm_trend = store.communication_trend(freq, since, until)
+        if not comm_trend.empty:
+            st.subheader("📡 Communication Rate")
+            trend_vendors = [v for v in comm_trend.columns if v != 'All Vendors']
+            shown = st.multiselect("Vendors", trend_vendors, key="trend_vendors")
+            st.plotly_chart(build_trend_figure(comm_trend[shown + ['All Vendors']], 'Vendor'),
+                            use_container_width=True)
+
+        fw_vendors = store.read(FW_ROLLUP, since, until)
+        if not fw_vendors.empty:
+            st.subheader("⚙️ Firmware Rollout")
+            vendor_choices = sorted(fw_vendors['vendor'].unique().tolist())
+            rollout_vendors = st.multiselect("Vendors (all when empty)", vendor_choices, key="rollout_vendors")
+            rollout = store.firmware_rollout(freq, since, until, vendors=rollout_vendors)
+            st.plotly_chart(build_trend_figure(rollout, 'Firmware Version', stacked=True), use_container_width=True)
+
+# =========================================================
+# RENDER
+# =========================================================
+PAGES = {
+    "Fleet Dashboard Analysis": render_dashboard_page,
+    "Master Data Comparison": render_comparison_page,
+    "Trends": render_trends_page,
+}
+PAGES[st.session_state.page]()
+
+# Shared result cache readout (one cache per server process). Drawn after the page, so the page paints
+# before the cache module (and pandas) is imported, and a Process Data run is reflected on the next full rerun.
+with st.sidebar.expander("Result Cache"):
+    cache_stats = get_result_cache().stats()
+    st.caption(f"{cache_stats['entries']} results · {cache_stats['sessions']} sessions")
+    st.caption(f"{cache_stats['memory_bytes'] / 1e6:,.1f} MB in memory · {cache_stats['disk_bytes'] / 1e6:,.1f} MB on disk")
+    st.caption(f"Hit rate {cache_stats['hit_rate']:.0%} · {cache_stats['evictions']} evictions · {cache_stats['spills']} spills")
@@ -0,0 +1,154 @@
+import argparse
+import fnmatch
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from processing import run_analysis, run_analysis_streaming
+from snapshots import SNAPSHOT_DIR, SnapshotStore
+from spool import write_parquet_chunks
+
+# Headless entry point: no streamlit / plotly / kaleido imports on this path.
+#
+#   python batch.py exports/ out/ --jobs 8 --format parquet
+#
+# `exports/` holds one sub-directory per day named YYYY-MM-DD, each with that morning's
+# Fleet Dashboard, Rebody, Field Maintenance and Sheddown exports (.xlsx, .csv or .csv.gz).
+
+DAY_FILE_STEMS = {
+    'dashboard': ['*dashboard*'],
+    'rebody': ['*rebody*'],
+    'fm': ['*field*maintenance*', 'fm*', '*_fm*'],
+    'sheddown': ['*sheddown*'],
+}
+DAY_FILE_EXTENSIONS = ['.xlsx', '.csv', '.csv.gz']
+DAY_FILE_PATTERNS = {role: [stem + ext for stem in stems for ext in DAY_FILE_EXTENSIONS]
+                     for role, stems in DAY_FILE_STEMS.items()}
+MODULES = ('comm', 'fw')
+
+
+def find_day_files(day_dir):
+    names = sorted(n for n in os.listdir(day_dir) if not n.startswith('~$'))
+    found = {}
+    for role, patterns in DAY_FILE_PATTERNS.items():
+        matches = [n for n in names if any(fnmatch.fnmatch(n.lower(), p) for p in patterns)]
+        if matches:
+            found[role] = os.path.join(day_dir, matches[0])
+    return found
+
+
+def discover_days(input_dir):
+    days = []
+    for name in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, name)
+        if not os.path.isdir(path):
+            continue
+        try:
+            day = date.fromisoformat(name)
+        except ValueError:
+            continue
+        days.append((day, find_day_files(path)))
+    return days
+
+
+def _write_frame(df, path_base, fmt, index):
+    if fmt == 'parquet':
+        if index:
+            # Summary labels as text, as the snapshot rollups store them: Excel firmware columns mix
+            # numbers (9.1) and text (1.0.3), which Parquet cannot store in one column
+            df = df.copy()
+            df.index = df.index.astype(str)
+            df.columns = df.columns.astype(str)
+        df.to_parquet(path_base + '.parquet', index=index)
+    else:
+        df.to_csv(path_base + '.csv', index=index)
+
+
+def process_day(day, files, output_dir, modules, fmt, streaming=False, snapshot_dir=None):
+    run_comm, run_fw = 'comm' in modules, 'fw' in modules
+    required = ['dashboard'] + (['rebody', 'fm', 'sheddown'] if run_comm else [])
+    missing = [role for role in required if role not in files]
+    if missing:
+        raise ValueError(f"Missing files for {day}: {missing}")
+
+    analyze = run_analysis_streaming if streaming else run_analysis
+    result = analyze(files['dashboard'], files.get('rebody'), files.get('fm'), files.get('sheddown'),
+                     run_comm, run_fw, day)
+
+    day_dir = os.path.join(output_dir, day.isoformat())
+    os.makedirs(day_dir, exist_ok=True)
+    if result['comm_raw'] is not None:
+        _write_frame(result['comm_raw'], os.path.join(day_dir, 'comm_summary'), fmt, index=True)
+        detailed_path = os.path.join(day_dir, 'Detailed_Fleet_Status')
+        if result.get('detailed_comm_file') is not None:
+            # Streaming runs already spooled the detailed list as CSV: copied out as-is, or converted
+            # chunk by chunk, never loaded whole
+            if fmt == 'parquet':
+                write_parquet_chunks(result['detailed_comm_file'].chunks(), detailed_path + '.parquet')
+            else:
+                shutil.copyfile(result['detailed_comm_file'].path, detailed_path + '.csv')
+        else:
+            _write_frame(result['detailed_comm_data'], detailed_path, fmt, index=False)
+    if result['fw_raw'] is not None:
+        _write_frame(result['fw_raw'], os.path.join(day_dir, 'fw_summary'), fmt, index=True)
+
+    if snapshot_dir is not None:
+        # Each day owns its own partitions, so parallel workers never write the same file
+        SnapshotStore(snapshot_dir).ingest(day, result)
+
+    if result.get('detailed_comm_file') is not None:
+        fleets = result['detailed_comm_file'].rows
+    else:
+        fleets = len(result['detailed_comm_data']) if result['detailed_comm_data'] is not None else None
+    return day, fleets
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Process daily fleet export sets without the Streamlit UI.")
+    parser.add_argument('input_dir', help="Directory with one YYYY-MM-DD sub-directory per day")
+    parser.add_argument('output_dir', help="Summaries and detailed fleet lists are written to OUTPUT_DIR/<day>/")
+    parser.add_argument('--modules', nargs='+', choices=MODULES, default=list(MODULES),
+                        help="Analysis modules to run (default: comm fw)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', dest='fmt')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument('--since', type=date.fromisoformat, help="First day to process (YYYY-MM-DD)")
+    parser.add_argument('--until', type=date.fromisoformat, help="Last day to process (YYYY-MM-DD)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Read each dashboard export in chunks (bounded memory for very large days)")
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR,
+                        help=f"Snapshot store the trend view reads (default: {SNAPSHOT_DIR})")
+    parser.add_argument('--no-snapshot', dest='snapshot_dir', action='store_const', const=None,
+                        help="Do not record the processed days in the snapshot store")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    days = [(day, files) for day, files in discover_days(args.input_dir)
+            if (args.since is None or day >= args.since) and (args.until is None or day <= args.until)]
+    if not days:
+        print(f"No YYYY-MM-DD day directories found in {args.input_dir}", file=sys.stderr)
+        return 1
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(process_day, day, files, args.output_dir, args.modules, args.fmt,
+                               args.streaming, args.snapshot_dir): day
+                   for day, files in days}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                _, fleets = future.result()
+                print(f"✅ {day}" + (f": {fleets} fleets" if fleets is not None else ""))
+            except Exception as e:
+                failures += 1
+                print(f"❌ {day}: {e}", file=sys.stderr)
+
+    print(f"Processed {len(days) - failures}/{len(days)} days into {args.output_dir}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+import pandas as pd
+
+from benchmarks.synthetic import EXCEL_MAX_ROWS, generate_exports, write_exports
+from ingest import FLEET_COLUMN, VENDOR_COLUMN, DATE_COLUMN, FW_COLUMN, dashboard_columns, smart_load
+from processing import (STATUS_COLUMN, communication_status, communication_summary, decode_fleet_numbers,
+                        firmware_summary, intern_fleet_numbers, match_priority, resolve_priority)
+
+# Times each stage of the Process Data pipeline on synthetic exports:
+#
+#   python -m benchmarks.bench_pipeline --sizes 10000 100000 1000000 --output bench_results.json
+#   python -m benchmarks.bench_pipeline --sizes 100000 --compare bench_results.json
+#
+# Sizes above the .xlsx row limit skip the Excel parse stage and start from in-memory frames.
+
+STAGES = ['parse', 'normalize', 'priority', 'merge', 'classify', 'pivot', 'styling', 'figure', 'png']
+CATEGORY_BY_FILE = {'rebody': 'Rebody Renovation', 'fm': 'Field Maintenance', 'sheddown': 'Sheddown'}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _stage_functions(exports, paths, as_of, with_png):
+    from views import build_figure, chart_data, style_summary, summary_table
+
+    state = {}
+
+    def parse():
+        rows = len(smart_load(paths['dashboard'], dashboard_columns(True, True)))
+        return rows + sum(len(smart_load(paths[k], [FLEET_COLUMN])) for k in CATEGORY_BY_FILE)
+
+    def normalize():
+        state['codes'], state['keys'] = intern_fleet_numbers(exports['dashboard'][FLEET_COLUMN])
+        return len(state['keys'])
+
+    def priority():
+        state['priority'] = resolve_priority({CATEGORY_BY_FILE[k]: exports[k] for k in CATEGORY_BY_FILE})
+        return len(state['priority'])
+
+    def merge():
+        state['category'] = match_priority(state['codes'], state['keys'], state['priority'])
+        return len(state['category'])
+
+    def classify():
+        dash = exports['dashboard']
+        state['classified'] = pd.DataFrame({
+            FLEET_COLUMN: decode_fleet_numbers(state['codes'], state['keys']),
+            VENDOR_COLUMN: pd.Categorical(dash[VENDOR_COLUMN]),
+            STATUS_COLUMN: communication_status(state['category'], dash[DATE_COLUMN], as_of),
+        })
+        return len(state['classified'])
+
+    def pivot():
+        state['comm'] = communication_summary(state['classified'])
+        state['fw'] = firmware_summary(exports['dashboard'][[VENDOR_COLUMN, FW_COLUMN]])
+        return state['comm'].size + state['fw'].size
+
+    def styling():
+        for name, drop_zeros in (('comm', False), ('fw', True)):
+            table = summary_table(state[name], list(state[name].columns), drop_zeros)
+            style_summary(table).to_html()
+            state[f'{name}_table'] = table
+        return state['fw_table'].size
+
+    def figure():
+        state['figures'] = [build_figure(chart_data(state['comm_table'], STATUS_COLUMN), STATUS_COLUMN,
+                                         "Default (Vendor Name)"),
+                            build_figure(chart_data(state['fw_table'], FW_COLUMN), FW_COLUMN,
+                                         "Total Count (High → Low)")]
+        return len(state['figures'])
+
+    def png():
+        import export
+        export._render_png.cache_clear()
+        return sum(len(export.chart_png(fig)) for fig in state['figures'])
+
+    return {'parse': parse if paths else None, 'normalize': normalize, 'priority': priority, 'merge': merge,
+            'classify': classify, 'pivot': pivot, 'styling': styling, 'figure': figure,
+            'png': png if with_png else None}
+
+
+def run_size(n_fleets, args):
+    exports = generate_exports(n_fleets, n_vendors=args.vendors, n_firmware=args.firmware,
+                               maintenance_fraction=args.maintenance, overlap=args.overlap,
+                               extra_columns=args.extra_columns, seed=args.seed)
+    as_of = date.today()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="fleet-bench-") as tmp:
+        paths = None
+        if args.excel and n_fleets <= EXCEL_MAX_ROWS:
+            paths = write_exports(exports, tmp)
+
+        stages = _stage_functions(exports, paths, as_of, args.png)
+        for stage in STAGES:
+            fn = stages[stage]
+            if fn is None:
+                results.append({'fleets': n_fleets, 'stage': stage, 'skipped': True})
+                continue
+            timings = []
+            try:
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    rows = fn()
+                    timings.append(time.perf_counter() - start)
+            except Exception as e:
+                results.append({'fleets': n_fleets, 'stage': stage, 'error': str(e).strip().splitlines()[0]})
+                continue
+            results.append({'fleets': n_fleets, 'stage': stage, 'rows': rows, 'best': min(timings),
+                            'median': statistics.median(timings), 'timings': timings})
+    return results
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r['fleets'], r['stage']): r['best'] for r in baseline['results'] if 'best' in r}
+    print(f"\nvs {baseline_path} ({baseline.get('revision')})")
+    for r in current:
+        key = (r['fleets'], r['stage'])
+        if 'best' in r and key in before:
+            ratio = r['best'] / before[key] if before[key] else float('inf')
+            flag = "  ⚠️ slower" if ratio > 1.2 else ""
+            print(f"{r['fleets']:>10,} {r['stage']:<10} {before[key]:9.4f}s -> {r['best']:9.4f}s  x{ratio:.2f}{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fleet pipeline stage by stage on synthetic exports.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000], help="Fleet counts to run")
+    parser.add_argument('--vendors', type=int, default=12)
+    parser.add_argument('--firmware', type=int, default=60, help="Distinct firmware versions")
+    parser.add_argument('--maintenance', type=float, default=0.05, help="Size of each maintenance list (fraction)")
+    parser.add_argument('--overlap', type=float, default=0.2, help="Share of each list also on the other lists")
+    parser.add_argument('--extra-columns', type=int, default=20, help="Unused dashboard columns")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-excel', dest='excel', action='store_false', help="Skip writing/parsing workbooks")
+    parser.add_argument('--no-png', dest='png', action='store_false', help="Skip the kaleido PNG export stage")
+    parser.add_argument('--output', default='bench_results.json', help="Machine-readable results file")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for n_fleets in args.sizes:
+        for r in run_size(n_fleets, args):
+            results.append(r)
+            if 'best' in r:
+                print(f"{r['fleets']:>10,} {r['stage']:<10} {r['best']:9.4f}s  (rows {r['rows']:,})")
+            else:
+                print(f"{r['fleets']:>10,} {r['stage']:<10} {'skipped' if r.get('skipped') else r['error']}")
+
+    report = {
+        'revision': _git_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'params': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
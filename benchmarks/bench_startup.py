@@ -0,0 +1,137 @@
+import argparse
+import ast
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+import streamlit as st
+
+from benchmarks.bench_pipeline import _git_revision
+
+# Measures how quickly the app comes up and reruns, each sample in a fresh interpreter:
+#
+#   python -m benchmarks.bench_startup --output startup_results.json
+#   python -m benchmarks.bench_startup --compare startup_results.json
+#
+#   import     importing everything app.py imports (the heavy modules that got loaded are listed)
+#   first_run  the first script run of a session on each page, imports included (time to first paint)
+#   rerun      the next full script run of the same page (navigation, or a widget outside the pages).
+#              Widgets on a page rerun only that page's fragment, which AppTest cannot trigger on its own.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+PAGES = ["Fleet Dashboard Analysis", "Master Data Comparison", "Trends"]
+HEAVY_MODULES = ['pandas', 'plotly.express', 'kaleido', 'openpyxl', 'PIL.ImageDraw']
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_RUN_PROBE = """
+import json, logging, sys, time
+logging.disable(logging.WARNING)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.session_state.page = {page!r}
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+reruns = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({{'first_run': first, 'rerun': reruns, 'errors': [str(e.value) for e in at.exception],
+                  'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _app_imports():
+    # Top-level import statements of app.py, run as-is by the import probe
+    with open(APP_PATH, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _probe(code):
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(APP_PATH))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _summary(measure, page, timings, **extra):
+    return {'measure': measure, 'page': page, 'best': min(timings), 'median': statistics.median(timings),
+            'timings': timings, **extra}
+
+
+def run_benchmark(args):
+    results = []
+    samples = [_probe(_IMPORT_PROBE.format(imports=_app_imports(), heavy=HEAVY_MODULES)) for _ in range(args.repeat)]
+    results.append(_summary('import', None, [s['seconds'] for s in samples], heavy=samples[-1]['heavy']))
+
+    for page in PAGES:
+        samples = [_probe(_RUN_PROBE.format(app=APP_PATH, page=page, reruns=args.reruns, heavy=HEAVY_MODULES))
+                   for _ in range(args.repeat)]
+        errors = samples[-1]['errors']
+        results.append(_summary('first_run', page, [s['first_run'] for s in samples], heavy=samples[-1]['heavy'],
+                                errors=errors))
+        results.append(_summary('rerun', page, [t for s in samples for t in s['rerun']], errors=errors))
+    return results
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r['measure'], r['page']): r['best'] for r in baseline['results']}
+    print(f"\nvs {baseline_path} ({baseline.get('revision')})")
+    for r in current:
+        key = (r['measure'], r['page'])
+        if key in before:
+            ratio = r['best'] / before[key] if before[key] else float('inf')
+            flag = "  ⚠️ slower" if ratio > 1.2 else ""
+            print(f"{r['measure']:<10} {r['page'] or '':<26} {before[key]:8.4f}s -> {r['best']:8.4f}s  x{ratio:.2f}{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app import, first script run and rerun per page.")
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument('--reruns', type=int, default=3, help="Reruns timed in each interpreter")
+    parser.add_argument('--output', default='startup_results.json', help="Machine-readable results file")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_benchmark(args)
+    for r in results:
+        heavy = f"  loads {', '.join(r['heavy'])}" if r.get('heavy') else ""
+        errors = f"  errors: {r['errors']}" if r.get('errors') else ""
+        print(f"{r['measure']:<10} {r['page'] or '':<26} {r['best']:8.4f}s (median {r['median']:.4f}s){heavy}{errors}")
+
+    report = {
+        'revision': _git_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'streamlit': st.__version__,
+        'params': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
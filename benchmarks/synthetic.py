@@ -0,0 +1,93 @@
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from ingest import FLEET_COLUMN, VENDOR_COLUMN, DATE_COLUMN, FW_COLUMN
+
+# Data rows an .xlsx sheet can hold below its header row
+EXCEL_MAX_ROWS = 1_048_575
+
+MAINTENANCE_FILES = ('rebody', 'fm', 'sheddown')
+
+
+def vendor_names(n_vendors):
+    return ["Prime Edge"] + [f"Vendor {i:02d}" for i in range(1, n_vendors)]
+
+
+def firmware_versions(n_firmware):
+    # Mix of short and dotted versions with double-digit components ("9.1" vs "10.2")
+    return [f"{1 + i // 25}.{(i // 5) % 5 * 3}.{i % 5}" if i % 3 else f"{1 + i // 25}.{i % 25}"
+            for i in range(n_firmware)]
+
+
+def generate_exports(n_fleets, n_vendors=12, n_firmware=60, maintenance_fraction=0.05, overlap=0.2,
+                     comm_fraction=0.7, extra_columns=20, blank_fraction=0.001, as_of=None, seed=0):
+    # Returns Fleet Dashboard, Rebody, Field Maintenance and Sheddown frames shaped like the real exports
+    rng = np.random.default_rng(seed)
+    as_of = as_of or date.today()
+
+    fleets = rng.permutation(np.arange(100_000, 100_000 + n_fleets)).astype('float64')
+    fleets[rng.random(n_fleets) < blank_fraction] = np.nan
+
+    # Zipf-ish popularity so a handful of vendors / versions dominate, like the real fleet
+    vendor_weights = 1 / np.arange(1, n_vendors + 1)
+    fw_weights = 1 / np.arange(1, n_firmware + 1) ** 0.8
+    vendors = np.array(vendor_names(n_vendors), dtype=object)[
+        rng.choice(n_vendors, n_fleets, p=vendor_weights / vendor_weights.sum())]
+    firmware = np.array(firmware_versions(n_firmware), dtype=object)[
+        rng.choice(n_firmware, n_fleets, p=fw_weights / fw_weights.sum())]
+
+    recent = rng.random(n_fleets) < comm_fraction
+    age_days = np.where(recent, rng.integers(0, 2, n_fleets), rng.integers(2, 60, n_fleets))
+    last_updated = (pd.Timestamp(as_of) - pd.to_timedelta(age_days, unit='D')
+                    + pd.to_timedelta(rng.integers(0, 86_400, n_fleets), unit='s'))
+
+    dashboard = {
+        FLEET_COLUMN: fleets,
+        VENDOR_COLUMN: vendors,
+        DATE_COLUMN: last_updated,
+        FW_COLUMN: firmware,
+    }
+    for i in range(extra_columns):
+        dashboard[f"Extra Column {i + 1}"] = rng.integers(0, 1000, n_fleets) if i % 2 else f"value {i}"
+    dashboard = pd.DataFrame(dashboard)
+
+    # Maintenance lists: each draws part of its fleets from a pool shared with the other lists
+    known = fleets[~np.isnan(fleets)]
+    list_size = int(len(known) * maintenance_fraction)
+    shared = rng.choice(known, int(list_size * overlap), replace=False) if list_size else known[:0]
+    lists = {}
+    for name in MAINTENANCE_FILES:
+        own = rng.choice(known, list_size - len(shared), replace=False)
+        lists[name] = pd.DataFrame({FLEET_COLUMN: np.concatenate([shared, own]), 'Remarks': name})
+
+    return {'dashboard': dashboard, **lists}
+
+
+def write_xlsx(df, path):
+    # openpyxl write-only mode streams rows to disk instead of building the sheet in memory
+    from openpyxl import Workbook
+
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(df)} rows do not fit in an .xlsx sheet (max {EXCEL_MAX_ROWS})")
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    # Timestamps are datetime subclasses, so openpyxl writes them as date cells
+    columns = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in df.columns]
+    for row in zip(*columns):
+        ws.append(row)
+    wb.save(path)
+
+
+def write_exports(exports, directory):
+    os.makedirs(directory, exist_ok=True)
+    names = {'dashboard': 'Fleet_Dashboard.xlsx', 'rebody': 'Rebody.xlsx', 'fm': 'Field_Maintenance.xlsx',
+             'sheddown': 'Sheddown.xlsx'}
+    paths = {}
+    for key, df in exports.items():
+        paths[key] = os.path.join(directory, names[key])
+        write_xlsx(df, paths[key])
+    return paths
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+# --- CACHE SETTINGS (override through the environment) ---
+CACHE_MAX_ENTRIES = int(os.environ.get("FLEET_CACHE_MAX_ENTRIES", "16"))
+CACHE_TTL_SECONDS = float(os.environ.get("FLEET_CACHE_TTL_SECONDS", str(12 * 60 * 60)))
+CACHE_MAX_BYTES = int(os.environ.get("FLEET_CACHE_MAX_BYTES", str(1024 ** 3)))
+CACHE_SPILL_DIR = os.environ.get("FLEET_CACHE_SPILL_DIR")
+
+
+def file_digest(file_obj):
+    if file_obj is None:
+        return None
+    h = hashlib.blake2b(digest_size=20)
+    if hasattr(file_obj, "getbuffer"):
+        h.update(file_obj.getbuffer())
+    else:
+        file_obj.seek(0)
+        for chunk in iter(lambda: file_obj.read(1 << 20), b""):
+            h.update(chunk)
+        file_obj.seek(0)
+    return h.hexdigest()
+
+
+def result_key(files, modules, as_of):
+    # Content digests, not file names: the same export uploaded twice maps to one entry
+    return tuple(file_digest(f) for f in files), tuple(modules), as_of.isoformat()
+
+
+def _frame_bytes(value):
+    return sum(int(v.memory_usage(deep=True).sum()) for v in value.values() if isinstance(v, pd.DataFrame))
+
+
+class Lease:
+    # Held in a session's state; the entry counts one reference per live lease
+    __slots__ = ("key", "__weakref__")
+
+    def __init__(self, key):
+        self.key = key
+
+
+class _Entry:
+    __slots__ = ("value", "files", "rest", "nbytes", "stored_at", "leases")
+
+    def __init__(self, value):
+        self.value = value
+        self.files = {}
+        self.rest = {}
+        self.nbytes = _frame_bytes(value)
+        self.stored_at = time.monotonic()
+        self.leases = weakref.WeakSet()
+
+
+class ResultCache:
+    # Process-wide store of processed results, shared by every Streamlit session.
+    # DataFrames are kept in memory up to `max_bytes`; beyond that the least recently used
+    # entries are spilled to Parquet (pickle when a frame has mixed-type labels) and read
+    # back on demand. Entries still leased by a session are spilled and evicted last.
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES,
+                 spill_dir=CACHE_SPILL_DIR):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spills = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- PUBLIC API ---
+    def get(self, key, record=True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.stored_at > self.ttl_seconds:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                if record: self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            if record: self.hits += 1
+            if entry.value is not None:
+                return entry.value
+
+            value = self._load(entry)
+            if entry.nbytes <= self.max_bytes:
+                self._remove_files(entry)
+                entry.value = value
+                self.memory_bytes += entry.nbytes
+                self._enforce_budget(keep=key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            entry = _Entry(value)
+            self._entries[key] = entry
+            self.memory_bytes += entry.nbytes
+            self._enforce_budget(keep=key)
+            # The new entry is never the victim: when every other entry is leased, the least recently
+            # used leased one goes (its session is told the results expired)
+            while len(self._entries) > max(self.max_entries, 1):
+                self._drop(self._victim(k for k in self._entries if k != key))
+                self.evictions += 1
+
+    def lease(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            lease = Lease(key)
+            entry.leases.add(lease)
+            return lease
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'memory_bytes': self.memory_bytes,
+                'disk_bytes': self.disk_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'spills': self.spills,
+                'sessions': sum(len(e.leases) for e in self._entries.values()),
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- INTERNALS (caller holds the lock) ---
+    def _victim(self, keys):
+        # Least recently used first, preferring entries no session is looking at
+        keys = list(keys)
+        unleased = [k for k in keys if not self._entries[k].leases]
+        return (unleased or keys)[0]
+
+    def _enforce_budget(self, keep):
+        while self.memory_bytes > self.max_bytes:
+            resident = [k for k, e in self._entries.items() if e.value is not None and k != keep]
+            if not resident:
+                # A single result larger than the whole budget lives on disk only
+                if self._entries[keep].value is not None: self._spill(self._entries[keep], keep)
+                break
+            victim = self._victim(resident)
+            self._spill(self._entries[victim], victim)
+
+    def _spill(self, entry, key):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="fleet-cache-")
+        stem = hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+        for name, frame in entry.value.items():
+            if not isinstance(frame, pd.DataFrame):
+                # Non-frame parts (vendor list, contact and firmware indexes) are small and stay in memory
+                entry.rest[name] = frame
+                continue
+            path = os.path.join(self.spill_dir, f"{stem}-{name}")
+            try:
+                frame.to_parquet(path + ".parquet")
+                path += ".parquet"
+            except (ImportError, TypeError, ValueError):
+                frame.to_pickle(path + ".pkl")
+                path += ".pkl"
+            entry.files[name] = path
+            self.disk_bytes += os.path.getsize(path)
+        entry.value = None
+        self.memory_bytes -= entry.nbytes
+        self.spills += 1
+
+    def _load(self, entry):
+        value = dict(entry.rest)
+        for name, path in entry.files.items():
+            value[name] = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_pickle(path)
+        return value
+
+    def _remove_files(self, entry):
+        for path in entry.files.values():
+            self.disk_bytes -= os.path.getsize(path)
+            os.remove(path)
+        entry.files = {}
+        entry.rest = {}
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        if entry.value is not None:
+            self.memory_bytes -= entry.nbytes
+        self._remove_files(entry)
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from ingest import FLEET_COLUMN, VENDOR_COLUMN, FW_COLUMN, header_columns, smart_load
+from processing import comparable_fleet_keys, decode_fleet_numbers, intern_fleet_numbers
+from profiling import NULL_PROFILER
+
+# --- DIFF CATEGORIES (key -> label shown on the page) ---
+DIFF_CATEGORIES = {
+    'missing_from_dashboard': "In Master, missing from Dashboard",
+    'missing_from_master': "On Dashboard, missing from Master",
+    'vendor_mismatch': "Vendor mismatch",
+    'firmware_mismatch': "Firmware mismatch",
+    'duplicate_master': "Duplicate in Master",
+    'duplicate_dashboard': "Duplicate on Dashboard",
+}
+COMPARE_STAGE_LABELS = {
+    'parse_master': "Reading Master Register",
+    'parse_dashboard': "Reading Fleet Dashboard",
+    'index': "Indexing fleet numbers",
+    'diff': "Comparing registers",
+}
+PAGE_SIZE = 100
+
+_SIDE_CATEGORIES = {'missing_from_dashboard': 'master', 'missing_from_master': 'dashboard',
+                    'duplicate_master': 'master', 'duplicate_dashboard': 'dashboard'}
+_MISMATCH_COLUMNS = {'vendor_mismatch': VENDOR_COLUMN, 'firmware_mismatch': FW_COLUMN}
+
+
+def load_register(file_obj):
+    # Firmware is compared only when the file carries it; fleet number and vendor are required.
+    # The header decides which columns to project, so the body is parsed once either way.
+    columns = [FLEET_COLUMN, VENDOR_COLUMN]
+    if FW_COLUMN in header_columns(file_obj):
+        columns.append(FW_COLUMN)
+    return smart_load(file_obj, columns)
+
+
+def _clean_values(series):
+    return series.astype(str).str.strip().where(series.notna(), '').to_numpy()
+
+
+class _Side:
+    # One register keyed on the normalized Fleet Number. Rows without a fleet number take no part.
+
+    def __init__(self, df):
+        self.df = df
+        # Every row gets the integer code of its normalized fleet number (-1 for blanks)
+        self.codes, self.keys = intern_fleet_numbers(df[FLEET_COLUMN])
+        valid = self.codes >= 0
+        if not pd.api.types.is_numeric_dtype(self.keys.dtype):
+            valid &= np.append(self.keys.to_numpy() != '', False)[self.codes]
+        rows = np.flatnonzero(valid)
+        codes = self.codes[valid]
+
+        # Index over the first row per fleet; duplicates are reported, not joined twice
+        first = np.full(len(self.keys), -1, dtype=np.int64)
+        first[codes[::-1]] = rows[::-1]
+        listed = first >= 0
+        self.positions = first[listed]
+        self.index = self.keys[listed]
+        repeated = np.bincount(codes, minlength=len(self.keys))[codes] > 1
+        self.duplicates = rows[repeated][np.argsort(codes[repeated], kind='stable')]
+
+    def fleet_numbers(self, rows):
+        return decode_fleet_numbers(self.codes[rows], self.keys)
+
+
+class Comparison:
+    # Counts are available as soon as the diff is built; detail rows are only materialized per page
+
+    def __init__(self, master, dashboard):
+        self.master, self.dashboard = m, d = master, dashboard
+
+        # Hash join of the two unique-key indexes (integer keys when both exports have numeric fleet numbers)
+        d_keys, m_keys = comparable_fleet_keys(d.index, m.index)
+        d_in_m = m_keys.get_indexer(d_keys)
+        matched = d_in_m != -1
+        self.pairs = (m.positions[d_in_m[matched]], d.positions[matched])
+        m_found = np.zeros(len(m.index), dtype=bool)
+        m_found[d_in_m[matched]] = True
+
+        self.rows = {
+            'missing_from_dashboard': m.positions[~m_found],
+            'missing_from_master': d.positions[~matched],
+            'duplicate_master': m.duplicates,
+            'duplicate_dashboard': d.duplicates,
+        }
+        for category, column in _MISMATCH_COLUMNS.items():
+            if column in m.df.columns and column in d.df.columns:
+                mv = _clean_values(m.df[column])[self.pairs[0]]
+                dv = _clean_values(d.df[column])[self.pairs[1]]
+                self.rows[category] = np.flatnonzero(mv != dv)
+            else:
+                self.rows[category] = None
+
+    def counts(self):
+        return {category: None if self.rows[category] is None else len(self.rows[category])
+                for category in DIFF_CATEGORIES}
+
+    def page_count(self, category, page_size=PAGE_SIZE):
+        rows = self.rows[category]
+        return max(1, -(-len(rows) // page_size)) if rows is not None else 0
+
+    def details(self, category, page=0, page_size=PAGE_SIZE):
+        rows = self.rows[category]
+        if rows is None:
+            return pd.DataFrame()
+        return self._frame(category, rows[page * page_size:(page + 1) * page_size])
+
+    def full(self, category):
+        rows = self.rows[category]
+        return pd.DataFrame() if rows is None else self._frame(category, rows)
+
+    def _frame(self, category, rows):
+        if category in _SIDE_CATEGORIES:
+            side = self.master if _SIDE_CATEGORIES[category] == 'master' else self.dashboard
+            frame = side.df.iloc[rows].copy()
+            frame[FLEET_COLUMN] = side.fleet_numbers(rows)
+            # Position among the data rows that were read: blank lines are skipped by the readers,
+            # so this is not necessarily the row number in the sheet
+            frame.insert(0, 'Record', rows + 1)
+            return frame.reset_index(drop=True)
+
+        column = _MISMATCH_COLUMNS[category]
+        m_rows, d_rows = self.pairs[0][rows], self.pairs[1][rows]
+        return pd.DataFrame({
+            FLEET_COLUMN: self.master.fleet_numbers(m_rows),
+            f'Master {column}': self.master.df[column].to_numpy()[m_rows],
+            f'Dashboard {column}': self.dashboard.df[column].to_numpy()[d_rows],
+        })
+
+
+def compare_registers(master, dashboard):
+    return Comparison(_Side(master), _Side(dashboard))
+
+
+def run_comparison(file_master, file_dashboard, profiler=NULL_PROFILER):
+    with profiler.stage('parse_master') as rec:
+        master = load_register(file_master)
+        rec['rows_out'] = len(master)
+    with profiler.stage('parse_dashboard') as rec:
+        dashboard = load_register(file_dashboard)
+        rec['rows_out'] = len(dashboard)
+    with profiler.stage('index', rows_in=len(master) + len(dashboard)) as rec:
+        master, dashboard = _Side(master), _Side(dashboard)
+        rec['rows_out'] = len(master.index) + len(dashboard.index)
+    with profiler.stage('diff', rows_in=rec['rows_out']) as rec:
+        comparison = Comparison(master, dashboard)
+        rec['rows_out'] = sum(n or 0 for n in comparison.counts().values())
+    return comparison
@@ -0,0 +1,231 @@
+import io
+import json
+import shutil
+import threading
+import zipfile
+from functools import lru_cache
+
+from ingest import CHUNK_ROWS
+from spool import SpoolFile, write_parquet_chunks
+from views import SORT_OPTIONS, build_figure, chart_data, summary_table
+
+# --- CHART PNG EXPORT (High Res: 1800x1000) ---
+PNG_WIDTH = 1800
+PNG_HEIGHT = 1000
+PNG_CORNER_RADIUS = 30
+PNG_CACHE_MAX_ENTRIES = 32
+
+# --- EXPORT BUNDLE (key -> (label, file extension, mime type)) ---
+BUNDLE_FORMATS = {
+    'csv': ("ZIP of CSV files", 'zip', 'application/zip'),
+    'xlsx': ("Excel workbook (XLSX)", 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ("ZIP of Parquet files", 'zip', 'application/zip'),
+}
+XLSX_MAX_ROWS = 1048576
+
+# Summary sections in the bundle: result key, file/sheet name, row label, drop all-zero rows
+_BUNDLE_SECTIONS = (
+    ('comm_raw', 'Communication_Summary', 'Final Status', False),
+    ('fw_raw', 'Firmware_Summary', 'Firmware Version', True),
+)
+_DETAILED_NAME = 'Detailed_Fleet_Status'
+_NOTES_NAME = 'Export_Notes'
+
+_renderer_lock = threading.Lock()
+_renderer_started = False
+
+
+def add_rounded_corners(im, rad):
+    from PIL import Image, ImageDraw
+
+    circle = Image.new('L', (rad * 2, rad * 2), 0)
+    draw = ImageDraw.Draw(circle)
+    draw.ellipse((0, 0, rad * 2 - 1, rad * 2 - 1), fill=255)
+    alpha = Image.new('L', im.size, 255)
+    w, h = im.size
+    alpha.paste(circle.crop((0, 0, rad, rad)), (0, 0))
+    alpha.paste(circle.crop((0, rad, rad, rad * 2)), (0, h - rad))
+    alpha.paste(circle.crop((rad, 0, rad * 2, rad)), (w - rad, 0))
+    alpha.paste(circle.crop((rad, rad, rad * 2, rad * 2)), (w - rad, h - rad))
+    im.putalpha(alpha)
+    return im
+
+
+def _to_png(fig_dict):
+    # Kaleido >= 1.0 can keep one headless browser alive for the whole process; without it
+    # every export pays the browser startup cost again. The server is only started after a
+    # one-shot render succeeds, since a server without a usable browser blocks forever.
+    global _renderer_started
+    import plotly.io as pio
+
+    img_bytes = pio.to_image(fig_dict, format="png", width=PNG_WIDTH, height=PNG_HEIGHT, scale=1)
+    if not _renderer_started:
+        import kaleido
+        start = getattr(kaleido, "start_sync_server", None)
+        if start is not None:
+            start(silence_warnings=True)
+        _renderer_started = True
+    return img_bytes
+
+
+@lru_cache(maxsize=PNG_CACHE_MAX_ENTRIES)
+def _render_png(fig_json):
+    from PIL import Image
+
+    with _renderer_lock:
+        img_bytes = _to_png(json.loads(fig_json))
+
+    # Decode once, flatten onto white, then round the corners
+    chart = Image.open(io.BytesIO(img_bytes)).convert("RGBA")
+    bg = Image.new("RGB", chart.size, (255, 255, 255))
+    bg.paste(chart, mask=chart.split()[3])
+    final_buffer = io.BytesIO()
+    add_rounded_corners(bg.convert("RGBA"), PNG_CORNER_RADIUS).save(final_buffer, format="PNG")
+    return final_buffer.getvalue()
+
+
+def chart_png(fig):
+    # The figure JSON carries the chart data, vendor selection and sort order, so it is the memo key
+    return _render_png(fig.to_json())
+
+
+# --- EXPORT FILES (built once per result, kept on disk, read only when downloaded) ---
+class ExportFile(SpoolFile):
+    # `skipped` lists the parts left out of a bundle (charts without a headless browser)
+
+    def __init__(self, suffix):
+        super().__init__("fleet-export-", suffix)
+        self.skipped = []
+
+
+def detailed_csv(result):
+    # The streaming path already spooled the list as CSV; in-memory lists are written out in chunks
+    if result.get('detailed_comm_file') is not None:
+        return result['detailed_comm_file']
+    export_file = ExportFile('.csv')
+    with open(export_file.path, 'w', encoding='utf-8', newline='') as f:
+        _write_csv(result['detailed_comm_data'], f)
+    return export_file
+
+
+def _write_csv(df, f):
+    for start in range(0, len(df), CHUNK_ROWS):
+        df.iloc[start:start + CHUNK_ROWS].to_csv(f, index=False, header=start == 0)
+
+
+def _detailed_chunks(result):
+    if result.get('detailed_comm_file') is not None:
+        yield from result['detailed_comm_file'].chunks()
+    elif result.get('detailed_comm_data') is not None:
+        df = result['detailed_comm_data']
+        for start in range(0, len(df), CHUNK_ROWS):
+            yield df.iloc[start:start + CHUNK_ROWS]
+
+
+def _bundle_parts(result):
+    # Summaries over every vendor in each table (the on-screen filters are a view), and their charts
+    tables, figures = {}, {}
+    for key, name, row_index_col, drop_zeros in _BUNDLE_SECTIONS:
+        if result.get(key) is not None:
+            tables[name] = summary_table(result[key], list(result[key].columns), drop_zeros)
+            figures[name] = build_figure(chart_data(tables[name], row_index_col), row_index_col, SORT_OPTIONS[0])
+    return tables, figures
+
+
+def _chart_pngs(figures, skipped):
+    # Chart rendering needs a headless browser; without one the bundle still carries the data
+    pngs = {}
+    for name, fig in figures.items():
+        try:
+            pngs[name] = chart_png(fig)
+        except Exception as e:
+            skipped.append(f"{name.replace('_', ' ')} chart ({str(e).strip().splitlines()[0]})")
+    return pngs
+
+
+def export_bundle(result, fmt):
+    label, extension, _ = BUNDLE_FORMATS[fmt]
+    bundle = ExportFile('.' + extension)
+    tables, figures = _bundle_parts(result)
+    pngs = _chart_pngs(figures, bundle.skipped)
+    if fmt == 'xlsx':
+        _write_xlsx(bundle.path, result, tables, pngs, bundle.skipped)
+    else:
+        _write_zip(bundle.path, result, tables, pngs, fmt, bundle.skipped)
+    return bundle
+
+
+def _notes(skipped):
+    # Whatever was left out is also said inside the file, for whoever opens it later
+    return ["Left out of this export:"] + [f"- {part}" for part in skipped]
+
+
+def _write_zip(path, result, tables, pngs, fmt, skipped):
+    # Parquet is compressed per column already, so its members are only stored
+    compression = zipfile.ZIP_STORED if fmt == 'parquet' else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(path, 'w', compression=compression) as zf:
+        if fmt == 'csv':
+            for name, table in tables.items():
+                zf.writestr(f'{name}.csv', table.to_csv())
+            if result.get('detailed_comm_file') is not None:
+                with open(result['detailed_comm_file'].path, 'rb') as src, \
+                        zf.open(f'{_DETAILED_NAME}.csv', 'w', force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst)
+            elif result.get('detailed_comm_data') is not None:
+                with zf.open(f'{_DETAILED_NAME}.csv', 'w', force_zip64=True) as dst:
+                    with io.TextIOWrapper(dst, encoding='utf-8', newline='') as f:
+                        _write_csv(result['detailed_comm_data'], f)
+        else:
+            for name, table in tables.items():
+                with zf.open(f'{name}.parquet', 'w') as dst:
+                    _text_labels(table).to_parquet(dst, index=False)
+            if result.get('detailed_comm_file') is not None or result.get('detailed_comm_data') is not None:
+                with zf.open(f'{_DETAILED_NAME}.parquet', 'w', force_zip64=True) as dst:
+                    write_parquet_chunks(_detailed_chunks(result), dst)
+        for name, png in pngs.items():
+            zf.writestr(f'{name}.png', png, compress_type=zipfile.ZIP_STORED)
+        if skipped:
+            zf.writestr(f'{_NOTES_NAME}.txt', "\n".join(_notes(skipped)) + "\n")
+
+
+def _text_labels(table):
+    # Summary labels as text: Excel firmware columns mix numbers (9.1) and text (1.0.3) in one column,
+    # which Parquet cannot store
+    table = table.copy()
+    table.index = table.index.astype(str)
+    table.columns = table.columns.astype(str)
+    return table.reset_index()
+
+
+def _write_xlsx(path, result, tables, pngs, skipped):
+    # Write-only mode streams rows to the file instead of holding every cell object in memory
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    from openpyxl.drawing.image import Image as SheetImage
+
+    wb = Workbook(write_only=True)
+    if skipped:
+        ws = wb.create_sheet(_NOTES_NAME.replace('_', ' '))
+        for line in _notes(skipped):
+            ws.append([line])
+    for name, table in tables.items():
+        ws = wb.create_sheet(name.replace('_', ' '))
+        ws.append([table.index.name or ''] + [str(c) for c in table.columns])
+        for label, row in zip(table.index, table.itertuples(index=False)):
+            ws.append([label] + [int(v) for v in row])
+        if name in pngs:
+            ws.add_image(SheetImage(io.BytesIO(pngs[name])), f'{get_column_letter(len(table.columns) + 3)}2')
+
+    # Sheets hold at most XLSX_MAX_ROWS rows, so a long list continues on numbered sheets
+    ws, sheet_rows, sheets = None, 0, 0
+    for chunk in _detailed_chunks(result):
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False):
+            if ws is None or sheet_rows == XLSX_MAX_ROWS:
+                sheets += 1
+                ws = wb.create_sheet('Detailed Fleet Status' + (f' {sheets}' if sheets > 1 else ''))
+                ws.append(list(chunk.columns))
+                sheet_rows = 1
+            ws.append(list(row))
+            sheet_rows += 1
+    wb.save(path)
@@ -0,0 +1,198 @@
+import importlib.util
+import io
+import os
+
+import pandas as pd
+
+# --- COLUMN NAMES ---
+FLEET_COLUMN = 'Fleet Number'
+VENDOR_COLUMN = 'Device Vendor'
+DATE_COLUMN = 'Last Updated'
+FW_COLUMN = 'Firmware Version'
+
+# Columns each analysis module reads from the Fleet Dashboard export
+MODULE_COLUMNS = {
+    'comm': [FLEET_COLUMN, VENDOR_COLUMN, DATE_COLUMN],
+    'fw': [FLEET_COLUMN, VENDOR_COLUMN, FW_COLUMN],
+}
+
+# Label columns read from CSV as text. read_csv infers types per chunk, so a chunk holding only 9.1 and
+# 10.2 would give float versions while the next chunk's "9.1" stays text; summaries would count both.
+TEXT_COLUMNS = [VENDOR_COLUMN, FW_COLUMN]
+
+# python-calamine (Rust reader) is used when installed; otherwise openpyxl in read-only mode
+HAS_CALAMINE = importlib.util.find_spec("python_calamine") is not None
+
+# Accepted upload types: Excel workbooks and (optionally gzipped) CSV exports
+UPLOAD_TYPES = ['xlsx', 'csv', 'gz']
+
+# Rows per chunk in streaming mode
+CHUNK_ROWS = int(os.environ.get("FLEET_CHUNK_ROWS", "50000"))
+
+# Worker processes that parse uploads in the background
+PARSE_WORKERS = int(os.environ.get("FLEET_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def dashboard_columns(run_comm, run_fw):
+    # Vendor list is always needed; everything else only for the selected modules
+    cols = [VENDOR_COLUMN]
+    for module, selected in (('comm', run_comm), ('fw', run_fw)):
+        if selected:
+            cols += [c for c in MODULE_COLUMNS[module] if c not in cols]
+    return cols
+
+
+def _missing_error(missing, found):
+    return ValueError(f"Missing columns: {missing}. Found: {found}")
+
+
+def _header_names(header):
+    # Same naming pandas uses for blank header cells
+    return [f"Unnamed: {i}" if h is None or str(h).strip() == "" else str(h).strip() for i, h in enumerate(header)]
+
+
+def _iter_openpyxl(file_obj, required_cols, chunksize=None):
+    # Yields frames of at most `chunksize` rows (all rows at once when None), always at least one
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_obj, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        found = _header_names(next(rows, ()))
+
+        positions = {}
+        for i, name in enumerate(found):
+            if name in required_cols and name not in positions:
+                positions[name] = i
+        missing = [col for col in required_cols if col not in positions]
+        if missing:
+            raise _missing_error(missing, found)
+
+        # Only the projected cells are kept; the rest of each row is dropped as it streams past
+        data = {col: [] for col in required_cols}
+        picks = [(data[col].append, positions[col]) for col in required_cols]
+        pending = 0
+        emitted = False
+        for row in rows:
+            if all(v is None or v == "" for v in row):
+                continue
+            width = len(row)
+            for append, i in picks:
+                v = row[i] if i < width else None
+                if isinstance(v, float) and v.is_integer():
+                    v = int(v)
+                append(v)
+            pending += 1
+            if chunksize and pending == chunksize:
+                yield pd.DataFrame(data, columns=required_cols)
+                for values in data.values():
+                    values.clear()
+                pending = 0
+                emitted = True
+        if pending or not emitted:
+            yield pd.DataFrame(data, columns=required_cols)
+    finally:
+        wb.close()
+
+
+def _head(file_obj, n):
+    if isinstance(file_obj, str):
+        with open(file_obj, 'rb') as f:
+            return f.read(n)
+    head = file_obj.read(n)
+    file_obj.seek(0)
+    return head
+
+
+def _is_gzip(file_obj):
+    return _head(file_obj, 2) == b'\x1f\x8b'
+
+
+def file_format(file_obj):
+    name = (file_obj if isinstance(file_obj, str) else getattr(file_obj, 'name', '') or '').lower()
+    if name.endswith('.xlsx'):
+        return 'xlsx'
+    if name.endswith('.csv') or name.endswith('.gz'):
+        return 'csv'
+    # No usable name: .xlsx files are zip archives
+    return 'xlsx' if _head(file_obj, 4) == b'PK\x03\x04' else 'csv'
+
+
+def _iter_csv(file_obj, required_cols, chunksize=None):
+    compression = 'gzip' if _is_gzip(file_obj) else None
+    header = pd.read_csv(file_obj, nrows=0, compression=compression).columns
+    found = [str(c).strip() for c in header]
+    missing = [col for col in required_cols if col not in found]
+    if missing:
+        raise _missing_error(missing, found)
+    if hasattr(file_obj, "seek"): file_obj.seek(0)
+
+    wanted = set(required_cols)
+    text = {c: str for c in header if str(c).strip() in wanted and str(c).strip() in TEXT_COLUMNS}
+    reader = pd.read_csv(file_obj, usecols=lambda c: str(c).strip() in wanted, compression=compression,
+                         dtype=text, chunksize=chunksize)
+    for chunk in ([reader] if chunksize is None else reader):
+        chunk.columns = chunk.columns.astype(str).str.strip()
+        yield chunk.loc[:, ~chunk.columns.duplicated()][required_cols]
+
+
+def _read_calamine(file_obj, required_cols):
+    wanted = set(required_cols)
+    df = pd.read_excel(file_obj, header=0, engine="calamine", usecols=lambda c: str(c).strip() in wanted)
+    df.columns = df.columns.astype(str).str.strip()
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    missing = [col for col in required_cols if col not in df.columns]
+    if missing:
+        if hasattr(file_obj, "seek"): file_obj.seek(0)
+        header = pd.read_excel(file_obj, header=0, nrows=0, engine="calamine").columns
+        raise _missing_error(missing, list(header.astype(str).str.strip()))
+    return df
+
+
+def header_columns(file_obj):
+    # Column names from the header row alone, stripped the way the readers match them
+    if hasattr(file_obj, "seek"): file_obj.seek(0)
+    if file_format(file_obj) == 'csv':
+        compression = 'gzip' if _is_gzip(file_obj) else None
+        found = [str(c).strip() for c in pd.read_csv(file_obj, nrows=0, compression=compression).columns]
+    elif HAS_CALAMINE:
+        found = list(pd.read_excel(file_obj, header=0, nrows=0, engine="calamine").columns.astype(str).str.strip())
+    else:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(file_obj, read_only=True, data_only=True)
+        try:
+            found = _header_names(next(wb.worksheets[0].iter_rows(values_only=True), ()))
+        finally:
+            wb.close()
+    if hasattr(file_obj, "seek"): file_obj.seek(0)
+    return found
+
+
+def iter_chunks(file_obj, required_cols, chunksize=CHUNK_ROWS):
+    # Streaming read: memory is bounded by `chunksize` rows of `required_cols`, whatever the file size
+    if hasattr(file_obj, "seek"): file_obj.seek(0)
+    if file_format(file_obj) == 'csv':
+        yield from _iter_csv(file_obj, required_cols, chunksize)
+    else:
+        yield from _iter_openpyxl(file_obj, required_cols, chunksize)
+
+
+def smart_load(file_obj, required_cols):
+    # Single pass over the upload, materializing only `required_cols`
+    if hasattr(file_obj, "seek"): file_obj.seek(0)
+    if file_format(file_obj) == 'csv':
+        df = next(_iter_csv(file_obj, required_cols))
+    elif HAS_CALAMINE:
+        df = _read_calamine(file_obj, required_cols)
+    else:
+        df = next(_iter_openpyxl(file_obj, required_cols))
+    return df[required_cols]
+
+
+def parse_upload(data, name, required_cols):
+    # Worker entry point: uploads cross the process boundary as bytes plus the file name (for the format)
+    buffer = io.BytesIO(data)
+    buffer.name = name
+    return smart_load(buffer, required_cols)
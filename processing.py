@@ -0,0 +1,510 @@
+import bisect
+import re
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+from ingest import (FLEET_COLUMN, VENDOR_COLUMN, DATE_COLUMN, FW_COLUMN, CHUNK_ROWS, dashboard_columns, iter_chunks,
+                    smart_load)
+from profiling import NULL_PROFILER
+from spool import SpoolFile, csv_chunks
+
+# --- COMMUNICATION STATUS RULES ---
+PRIORITY_MAP = {'Sheddown': 3, 'Field Maintenance': 2, 'Rebody Renovation': 1}
+STATUS_ORDER = ['Communication', 'No Communication', 'Rebody Renovation', 'Field Maintenance', 'Sheddown']
+STATUS_DTYPE = pd.CategoricalDtype(STATUS_ORDER, ordered=True)
+STATUS_COLUMN = 'Final Status'
+# Fleets last seen within this many days up to the as-of date (that day and the one before) are communicating
+COMM_WINDOW_DAYS = 2
+# Calendar day of a fleet's last contact (days since the epoch), and the status it falls back to when stale
+CONTACT_COLUMN = 'Last Contact Day'
+FALLBACK_COLUMN = 'Fallback Status'
+NO_CONTACT_DAY = np.iinfo(np.int64).min  # blank or unparseable Last Updated (NaT as a day number)
+
+# Pipeline stages in run order, with the label shown while each one runs
+STAGE_LABELS = {
+    'parse_dashboard': "Reading Fleet Dashboard",
+    'parse_rebody': "Reading Rebody File",
+    'parse_fm': "Reading Field Maintenance",
+    'parse_sheddown': "Reading Sheddown File",
+    'stream_dashboard': "Streaming Fleet Dashboard",
+    'normalize': "Normalizing fleet numbers",
+    'priority': "Resolving maintenance priority",
+    'merge': "Matching fleets to maintenance lists",
+    'classify': "Classifying communication status",
+    'comm_summary': "Building communication summary",
+    'fw_summary': "Building firmware summary",
+}
+_COMM_STAGES = ['parse_rebody', 'parse_fm', 'parse_sheddown', 'normalize', 'priority', 'merge', 'classify',
+                'comm_summary']
+
+_COMM_CODE = STATUS_ORDER.index('Communication')
+_NO_COMM_CODE = STATUS_ORDER.index('No Communication')
+
+
+def _whole_numbers(series):
+    # (int64 values, blank mask) when a numeric column holds only whole fleet numbers, else None
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return None
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    na = np.isnan(values)
+    whole = values[~na]
+    if not ((whole == np.floor(whole)).all() and (np.abs(whole) < 1e15).all()):
+        return None
+    return np.where(na, 0, values).astype(np.int64), na
+
+
+def normalize_fleet_numbers(series):
+    # Excel hands integer fleet numbers back as floats when the column has blanks
+    numbers = _whole_numbers(series)
+    if numbers is not None:
+        # Fast path: format whole numbers as integers directly instead of regex-stripping ".0"
+        values, na = numbers
+        out = pd.Series(values.astype(str), index=series.index)
+        if na.any():
+            out[na] = series[na].astype(str)
+        return out
+    return series.astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+
+
+def intern_fleet_numbers(series):
+    # Integer code per row into a dictionary of distinct normalized fleet numbers (-1 for blanks).
+    # Whole-number columns are coded on their int64 values, so no string is built; otherwise only
+    # the distinct raw values are normalized, and values that normalize alike (12, "12.0", " 12 ")
+    # share one code.
+    numbers = _whole_numbers(series)
+    if numbers is not None:
+        codes, keys = pd.factorize(pd.arrays.IntegerArray(*numbers))
+        return codes, pd.Index(np.asarray(keys, dtype=np.int64), name=FLEET_COLUMN)
+    raw_codes, raw_values = pd.factorize(series)
+    codes, keys = pd.factorize(normalize_fleet_numbers(pd.Series(raw_values)))
+    codes = np.append(codes, -1)  # raw code -1 (blank) stays -1
+    return codes[raw_codes], pd.Index(keys, name=FLEET_COLUMN)
+
+
+def _with_blank(keys):
+    # Lookup table order for code arrays: one slot per key, then the blank (-1) slot last
+    blank_dtype = 'float64' if pd.api.types.is_integer_dtype(keys.dtype) else keys.dtype
+    return keys.append(pd.Index([np.nan], dtype=blank_dtype))
+
+
+def comparable_fleet_keys(keys, index):
+    # Integer and string dictionaries meet in the normalized string form (only the distinct keys are converted)
+    if pd.api.types.is_numeric_dtype(keys.dtype) == pd.api.types.is_numeric_dtype(index.dtype):
+        return keys, index
+    if pd.api.types.is_numeric_dtype(keys.dtype):
+        return pd.Index(normalize_fleet_numbers(pd.Series(keys))), index
+    return keys, pd.Index(normalize_fleet_numbers(pd.Series(index)))
+
+
+def decode_fleet_numbers(codes, keys):
+    # Codes back to a column: nullable integers for numeric dictionaries (written out exactly like
+    # the normalized strings), strings otherwise
+    if pd.api.types.is_integer_dtype(keys.dtype):
+        return pd.arrays.IntegerArray(keys.to_numpy()[codes], codes == -1)
+    return _with_blank(keys).take(codes).array
+
+
+def resolve_priority(maintenance_lists):
+    # One category per fleet: the highest priority list it appears on (group max over fleet codes)
+    fleets = pd.concat([df[FLEET_COLUMN] for df in maintenance_lists.values()], ignore_index=True)
+    scores = np.concatenate([np.full(len(df), PRIORITY_MAP[category], dtype=np.int8)
+                             for category, df in maintenance_lists.items()])
+    codes, keys = intern_fleet_numbers(fleets)
+
+    # Blank fleet numbers (-1) land in the trailing slot and are kept as a NaN key, as a merge would match them
+    best = np.zeros(len(keys) + 1, dtype=np.int8)
+    np.maximum.at(best, codes, scores)
+    listed = best > 0
+    status_codes = np.array([STATUS_ORDER.index(category) for category, _ in
+                             sorted(PRIORITY_MAP.items(), key=lambda item: item[1])], dtype=np.int8)
+    return pd.Series(pd.Categorical.from_codes(status_codes[best[listed] - 1], dtype=STATUS_DTYPE),
+                     index=_with_blank(keys)[listed])
+
+
+def match_priority(codes, keys, priority):
+    # Maintenance category per row: each distinct fleet is looked up once, then joined on the integer codes
+    keys, index = comparable_fleet_keys(keys, priority.index)
+    hit = index.get_indexer(_with_blank(keys))
+    # A trailing -1 catches the misses, so empty maintenance lists need no special case
+    key_category = np.append(priority.cat.codes.to_numpy(), -1)[hit]
+    return pd.Categorical.from_codes(key_category[codes], dtype=STATUS_DTYPE)
+
+
+def day_number(day):
+    return int(np.datetime64(pd.Timestamp(day).date(), 'D').astype(np.int64))
+
+
+def contact_days(last_updated):
+    # Last Updated as calendar day numbers; NaT casts to NO_CONTACT_DAY, which no window reaches
+    last_day = pd.to_datetime(last_updated, errors='coerce')
+    return last_day.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def fallback_status(category):
+    # Status of a fleet that has not communicated: its maintenance category, or No Communication
+    codes = np.array(pd.Categorical(category, dtype=STATUS_DTYPE).codes, copy=True)
+    codes[codes == -1] = _NO_COMM_CODE
+    return pd.Categorical.from_codes(codes, dtype=STATUS_DTYPE)
+
+
+def window_status(fallback, days, as_of, window_days=COMM_WINDOW_DAYS):
+    end = day_number(as_of)
+    is_comm = (days <= end) & (days > end - window_days)
+    codes = np.array(fallback.codes, copy=True)
+    codes[is_comm] = _COMM_CODE
+    return pd.Categorical.from_codes(codes, dtype=STATUS_DTYPE)
+
+
+def communication_status(category, last_updated, as_of, window_days=COMM_WINDOW_DAYS):
+    # Fleets seen within `window_days` up to `as_of` (by default that day or the one before) are
+    # communicating; the rest fall back to their maintenance category, or No Communication.
+    return window_status(fallback_status(category), contact_days(last_updated), as_of, window_days)
+
+
+def classify_communication(df_dash, maintenance_lists, as_of, profiler=NULL_PROFILER, priority=None):
+    # `priority` lets the streaming path resolve the maintenance lists once for all chunks.
+    # The result is compact: vendors and statuses are categoricals, and fleet numbers join as integer
+    # codes. Fleet numbers are near-unique, so they are stored decoded (nullable integers when the
+    # export has numeric fleet numbers) rather than as a categorical.
+    with profiler.stage('normalize', rows_in=len(df_dash)) as rec:
+        codes, keys = intern_fleet_numbers(df_dash[FLEET_COLUMN])
+        rec['rows_out'] = len(keys)
+    if priority is None:
+        with profiler.stage('priority', rows_in=sum(len(df) for df in maintenance_lists.values())) as rec:
+            priority = resolve_priority(maintenance_lists)
+            rec['rows_out'] = len(priority)
+    with profiler.stage('merge', rows_in=len(codes)) as rec:
+        category = match_priority(codes, keys, priority)
+        rec['rows_out'] = int((category.codes >= 0).sum())
+    with profiler.stage('classify', rows_in=len(codes)) as rec:
+        # The contact day and fallback status stay on the frame for the contact index
+        fallback = fallback_status(category)
+        days = contact_days(df_dash[DATE_COLUMN])
+        df_classified = pd.DataFrame({
+            FLEET_COLUMN: decode_fleet_numbers(codes, keys),
+            VENDOR_COLUMN: pd.Categorical(df_dash[VENDOR_COLUMN]),
+            STATUS_COLUMN: window_status(fallback, days, as_of),
+            FALLBACK_COLUMN: fallback,
+            CONTACT_COLUMN: days,
+        })
+        rec['rows_out'] = len(df_classified)
+    return df_classified
+
+
+# --- SUMMARIES (built from (row, vendor) counts so partial counts can be merged chunk by chunk) ---
+def merge_counts(total, part):
+    return part if total is None else total.add(part, fill_value=0).astype('int64')
+
+
+def communication_counts(df_classified):
+    return df_classified.groupby([STATUS_COLUMN, VENDOR_COLUMN], observed=True).size()
+
+
+def _plain_labels(index, name):
+    # Categorical labels back to the plain (sorted) labels a pivot_table would give
+    if isinstance(index, pd.CategoricalIndex):
+        index = pd.Index(np.asarray(index), name=name)
+    return index
+
+
+def communication_table(counts):
+    if counts is None:
+        return pd.DataFrame(index=pd.Index(STATUS_ORDER, name=STATUS_COLUMN))
+    table = counts.unstack(fill_value=0)
+    table.index = pd.Index(table.index.astype(str), name=STATUS_COLUMN)
+    table.columns = _plain_labels(table.columns, VENDOR_COLUMN)
+    return table.reindex(STATUS_ORDER, fill_value=0).sort_index(axis=1)
+
+
+def communication_summary(df_classified):
+    return communication_table(communication_counts(df_classified))
+
+
+def contact_counts(df_classified):
+    return df_classified.groupby([FALLBACK_COLUMN, VENDOR_COLUMN, CONTACT_COLUMN], observed=True).size()
+
+
+class ContactIndex:
+    # Per-vendor histogram of last-contact days, kept as running totals over the sorted days. The
+    # communication summary for any as-of date and staleness window is then two lookups per
+    # (fallback status, vendor) row instead of a pass over the fleets.
+
+    def __init__(self, counts):
+        table = counts.unstack(CONTACT_COLUMN, fill_value=0).sort_index(axis=1)
+        self.days = table.columns.to_numpy(dtype=np.int64)
+        self.rows = table.index
+        self.cumulative = np.zeros((len(table), len(self.days) + 1), dtype=np.int64)
+        np.cumsum(table.to_numpy(), axis=1, out=self.cumulative[:, 1:])
+
+    def contact_range(self):
+        # First and last day any fleet was seen (None when no fleet has a usable Last Updated)
+        seen = self.days[self.days != NO_CONTACT_DAY]
+        if not len(seen):
+            return None
+        return tuple(pd.Timestamp(np.datetime64(int(d), 'D')).date() for d in (seen[0], seen[-1]))
+
+    def status_counts(self, as_of, window_days=COMM_WINDOW_DAYS):
+        # Same (status, vendor) counts communication_counts gives for a classification at this window
+        end = day_number(as_of)
+        lo = np.searchsorted(self.days, end - window_days, side='right')
+        hi = np.searchsorted(self.days, end, side='right')
+        comm = self.cumulative[:, hi] - self.cumulative[:, lo]
+        stale = pd.Series(self.cumulative[:, -1] - comm, index=self.rows)
+        seen = pd.Series(comm, index=self.rows).groupby(level=VENDOR_COLUMN, observed=True).sum()
+        seen.index = pd.MultiIndex.from_product([['Communication'], seen.index], names=[STATUS_COLUMN, VENDOR_COLUMN])
+        stale = stale.groupby(level=[FALLBACK_COLUMN, VENDOR_COLUMN], observed=True).sum()
+        stale.index = stale.index.set_names([STATUS_COLUMN, VENDOR_COLUMN]).set_levels(
+            stale.index.levels[0].astype(str), level=0)
+        return pd.concat([seen, stale])
+
+    def communication_summary(self, as_of, window_days=COMM_WINDOW_DAYS):
+        return communication_table(self.status_counts(as_of, window_days))
+
+
+def detailed_export(df_classified):
+    detailed = df_classified[[FLEET_COLUMN, STATUS_COLUMN, VENDOR_COLUMN]].copy()
+    detailed.columns = ['Fleet Number', 'Status', 'Vendor']
+    return detailed
+
+
+def version_key(version):
+    # "10.2" -> ((10, 2), "10.2"): numeric parts compare as numbers, so 9.1 sorts before 10.2; the text
+    # breaks ties between spellings of the same numbers ("2.0" / "v2.0")
+    version = str(version)
+    return tuple(int(part) for part in re.findall(r'\d+', version)), version
+
+
+def version_dtype(versions):
+    # Ordered categorical over the distinct version strings, oldest first (each string is parsed once)
+    return pd.CategoricalDtype(sorted({str(v) for v in versions}, key=version_key), ordered=True)
+
+
+def firmware_counts(df_dash):
+    keys = pd.DataFrame({FW_COLUMN: pd.Categorical(df_dash[FW_COLUMN]),
+                         VENDOR_COLUMN: pd.Categorical(df_dash[VENDOR_COLUMN])})
+    return keys.groupby([FW_COLUMN, VENDOR_COLUMN], observed=True).size()
+
+
+def firmware_table(counts):
+    # pd.pivot_table(..., aggfunc='size', fill_value=0), with versions in version order rather than lexical
+    if counts is None:
+        return pd.DataFrame(index=pd.Index([], name=FW_COLUMN))
+    table = counts.unstack(fill_value=0)
+    table.index = _plain_labels(table.index, FW_COLUMN)
+    table.columns = _plain_labels(table.columns, VENDOR_COLUMN)
+    return table.iloc[sorted(range(len(table)), key=lambda i: version_key(table.index[i]))].sort_index(axis=1)
+
+
+def firmware_summary(df_dash):
+    return firmware_table(firmware_counts(df_dash))
+
+
+class FirmwareIndex:
+    # Fleet counts per (version, vendor) over the ordered versions, kept as running totals down the
+    # versions. "Below version X" is then the running total at X's rank, so compliance queries are
+    # lookups rather than string filters. In-memory runs also keep the fleet rows, sorted by vendor then
+    # version, as a plain frame next to the index (so the result cache counts and spills it); each
+    # vendor's outdated fleets are one contiguous slice of it.
+
+    def __init__(self, counts):
+        counts = counts.copy()
+        counts.index = pd.MultiIndex.from_arrays(
+            [np.asarray(counts.index.get_level_values(0)).astype(str),
+             np.asarray(counts.index.get_level_values(1))], names=[FW_COLUMN, VENDOR_COLUMN])
+        counts = counts.groupby(level=[0, 1]).sum()
+        self.dtype = version_dtype(counts.index.get_level_values(0))
+        self.versions = list(self.dtype.categories)
+        self._keys = [version_key(v) for v in self.versions]
+        table = counts.unstack(VENDOR_COLUMN, fill_value=0).reindex(self.versions, fill_value=0).sort_index(axis=1)
+        self.vendors = table.columns
+        self.cumulative = np.zeros((len(self.versions) + 1, len(self.vendors)), dtype=np.int64)
+        np.cumsum(table.to_numpy(), axis=0, out=self.cumulative[1:])
+
+    @classmethod
+    def from_frame(cls, df_dash):
+        # (index, sorted fleet rows). Rows are coded on the raw values; only the distinct versions are turned into text and parsed
+        fw_codes, fw_values = pd.factorize(df_dash[FW_COLUMN])
+        vendor_codes, vendor_values = pd.factorize(df_dash[VENDOR_COLUMN])
+        kept = np.flatnonzero((fw_codes >= 0) & (vendor_codes >= 0))
+        fw_codes, vendor_codes = fw_codes[kept], vendor_codes[kept]
+        pair_counts = np.bincount(fw_codes * len(vendor_values) + vendor_codes,
+                                  minlength=len(fw_values) * len(vendor_values))
+        counts = pd.Series(pair_counts, index=pd.MultiIndex.from_product(
+            [np.asarray(fw_values).astype(str), np.asarray(vendor_values)]))
+        index = cls(counts[counts > 0])
+
+        ranks = index.dtype.categories.get_indexer(np.asarray(fw_values).astype(str))[fw_codes]
+        vendors = index.vendors.get_indexer(vendor_values)[vendor_codes]
+        order = np.argsort(vendors.astype(np.int64) * len(index.versions) + ranks, kind='stable')
+        codes, keys = intern_fleet_numbers(df_dash[FLEET_COLUMN])
+        fleets = pd.DataFrame({
+            FLEET_COLUMN: decode_fleet_numbers(codes[kept[order]], keys),
+            VENDOR_COLUMN: pd.Categorical.from_codes(vendors[order], categories=index.vendors),
+            FW_COLUMN: pd.Categorical.from_codes(ranks[order], dtype=index.dtype),
+        })
+        return index, fleets
+
+    def rank(self, target):
+        # Number of known versions older than `target` (which need not occur in the data)
+        return bisect.bisect_left(self._keys, version_key(target))
+
+    def below_target(self, target):
+        # Per vendor: fleets, fleets on a version older than `target`, and their share
+        below = self.cumulative[self.rank(target)]
+        total = self.cumulative[-1]
+        return pd.DataFrame({'Fleets': total, 'Below Target': below,
+                             'Share Below': np.divide(below, total, out=np.zeros(len(total)), where=total > 0)},
+                            index=self.vendors)
+
+    def latest_share(self):
+        # Per vendor: the newest version any of its fleets runs, and the share of its fleets on it
+        per_version = np.diff(self.cumulative, axis=0)
+        latest = len(self.versions) - 1 - np.argmax(per_version[::-1] > 0, axis=0)
+        on_latest = per_version[latest, np.arange(len(self.vendors))]
+        total = self.cumulative[-1]
+        return pd.DataFrame({'Latest Version': np.asarray(self.versions, dtype=object)[latest],
+                             'Fleets': total, 'On Latest': on_latest,
+                             'Share On Latest': np.divide(on_latest, total, out=np.zeros(len(total)),
+                                                          where=total > 0)},
+                            index=self.vendors)
+
+    def outdated_fleets(self, fleets, target, vendors=None):
+        # Rows of `fleets` (from from_frame) on a version older than `target`; None when the fleet rows
+        # were not kept (streaming runs)
+        if fleets is None:
+            return None
+        starts = np.concatenate([[0], self.cumulative[-1].cumsum()[:-1]])
+        lengths = self.cumulative[self.rank(target)]
+        if vendors is not None:
+            lengths = np.where(self.vendors.isin(vendors), lengths, 0)
+        rows = np.repeat(starts - np.concatenate([[0], lengths.cumsum()[:-1]]), lengths) + np.arange(lengths.sum())
+        return fleets.take(rows).reset_index(drop=True)
+
+
+class DetailedFile(SpoolFile):
+    # Detailed fleet list spooled to CSV by the streaming path
+
+    def __init__(self, spool_dir=None):
+        super().__init__("fleet-detailed-", ".csv", spool_dir)
+        self.rows = 0
+
+    def append(self, df):
+        df.to_csv(self.path, mode='a', header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def chunks(self):
+        return csv_chunks(self.path)
+
+
+def planned_stages(run_comm, run_fw, streaming=False):
+    if streaming:
+        comm = ['parse_rebody', 'parse_fm', 'parse_sheddown', 'priority'] if run_comm else []
+        return comm + ['stream_dashboard'] + (['comm_summary'] if run_comm else []) + (
+            ['fw_summary'] if run_fw else [])
+    return ['parse_dashboard'] + (_COMM_STAGES if run_comm else []) + (['fw_summary'] if run_fw else [])
+
+
+def load_frame(file_obj, required_cols):
+    # Uploads parsed ahead of time arrive as futures (or frames) instead of file objects
+    if isinstance(file_obj, Future):
+        file_obj = file_obj.result()
+    if isinstance(file_obj, pd.DataFrame):
+        return file_obj[required_cols]
+    return smart_load(file_obj, required_cols)
+
+
+def _load_maintenance_lists(file_rebody, file_fm, file_sheddown, profiler):
+    maintenance_lists = {}
+    for stage, category, file_obj in (('parse_rebody', 'Rebody Renovation', file_rebody),
+                                      ('parse_fm', 'Field Maintenance', file_fm),
+                                      ('parse_sheddown', 'Sheddown', file_sheddown)):
+        with profiler.stage(stage) as rec:
+            maintenance_lists[category] = load_frame(file_obj, [FLEET_COLUMN])
+            rec['rows_out'] = len(maintenance_lists[category])
+    return maintenance_lists
+
+
+def run_analysis(file_dashboard, file_rebody, file_fm, file_sheddown, run_comm, run_fw, as_of,
+                 profiler=NULL_PROFILER):
+    # Keys mirror the st.session_state entries the dashboard renders from
+    result = {'all_vendors_list': [], 'comm_raw': None, 'fw_raw': None, 'detailed_comm_data': None,
+              'contact_index': None, 'firmware_index': None, 'firmware_fleets': None}
+
+    # --- 1. LOAD DASHBOARD ONCE (only the columns the selected modules need) ---
+    with profiler.stage('parse_dashboard') as rec:
+        df_dash = load_frame(file_dashboard, dashboard_columns(run_comm, run_fw))
+        result['all_vendors_list'] = sorted(
+            df_dash[VENDOR_COLUMN].dropna().astype(str).str.strip().unique().tolist())
+        rec['rows_out'] = len(df_dash)
+
+    # --- 2. MODULE: COMMUNICATION ---
+    if run_comm:
+        maintenance_lists = _load_maintenance_lists(file_rebody, file_fm, file_sheddown, profiler)
+        df_classified = classify_communication(df_dash, maintenance_lists, as_of, profiler)
+        with profiler.stage('comm_summary', rows_in=len(df_classified)) as rec:
+            result['detailed_comm_data'] = detailed_export(df_classified)
+            result['comm_raw'] = communication_summary(df_classified)
+            result['contact_index'] = ContactIndex(contact_counts(df_classified))
+            rec['rows_out'] = len(result['comm_raw'])
+
+    # --- 3. MODULE: FIRMWARE ---
+    if run_fw:
+        with profiler.stage('fw_summary', rows_in=len(df_dash)) as rec:
+            result['fw_raw'] = firmware_summary(df_dash)
+            result['firmware_index'], result['firmware_fleets'] = FirmwareIndex.from_frame(df_dash)
+            rec['rows_out'] = len(result['fw_raw'])
+
+    return result
+
+
+def run_analysis_streaming(file_dashboard, file_rebody, file_fm, file_sheddown, run_comm, run_fw, as_of,
+                           profiler=NULL_PROFILER, chunksize=CHUNK_ROWS):
+    # Same summaries as run_analysis, but the dashboard is read `chunksize` rows at a time: pivots are
+    # merged from per-chunk counts and the detailed list is appended to a CSV on disk, so peak memory
+    # does not grow with the export size.
+    result = {'all_vendors_list': [], 'comm_raw': None, 'fw_raw': None, 'detailed_comm_data': None,
+              'detailed_comm_file': None, 'contact_index': None, 'firmware_index': None, 'firmware_fleets': None}
+
+    if run_comm:
+        maintenance_lists = _load_maintenance_lists(file_rebody, file_fm, file_sheddown, profiler)
+        with profiler.stage('priority', rows_in=sum(len(df) for df in maintenance_lists.values())) as rec:
+            priority = resolve_priority(maintenance_lists)
+            rec['rows_out'] = len(priority)
+        detailed_file = DetailedFile()
+
+    vendors = set()
+    comm_counts = contact_totals = fw_counts = None
+    with profiler.stage('stream_dashboard') as rec:
+        rows = 0
+        for chunk in iter_chunks(file_dashboard, dashboard_columns(run_comm, run_fw), chunksize):
+            rows += len(chunk)
+            vendors.update(chunk[VENDOR_COLUMN].dropna().astype(str).str.strip().unique().tolist())
+            if run_comm:
+                df_classified = classify_communication(chunk, None, as_of, priority=priority)
+                comm_counts = merge_counts(comm_counts, communication_counts(df_classified))
+                contact_totals = merge_counts(contact_totals, contact_counts(df_classified))
+                detailed_file.append(detailed_export(df_classified))
+            if run_fw:
+                fw_counts = merge_counts(fw_counts, firmware_counts(chunk))
+            profiler.log('chunk', stage='stream_dashboard', rows=rows)
+        rec['rows_out'] = rows
+    result['all_vendors_list'] = sorted(vendors)
+
+    if run_comm:
+        with profiler.stage('comm_summary', rows_in=rows) as rec:
+            result['comm_raw'] = communication_table(comm_counts)
+            if contact_totals is not None:
+                result['contact_index'] = ContactIndex(contact_totals)
+            result['detailed_comm_file'] = detailed_file
+            rec['rows_out'] = len(result['comm_raw'])
+
+    if run_fw:
+        with profiler.stage('fw_summary', rows_in=rows) as rec:
+            result['fw_raw'] = firmware_table(fw_counts)
+            if fw_counts is not None:
+                # Counts only: the chunks are gone, so fleets below a target can be counted but not listed
+                result['firmware_index'] = FirmwareIndex(fw_counts)
+            rec['rows_out'] = len(result['fw_raw'])
+
+    return result
@@ -0,0 +1,90 @@
+import json
+import logging
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager, nullcontext
+
+# One JSON object per line on the "fleet.perf" logger, for monitoring to pick up
+logger = logging.getLogger("fleet.perf")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# tracemalloc is process-wide; keep it running while any profiler is measuring memory
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+class Profiler:
+    # Records wall time, rows in/out and (optionally) peak traced memory for each pipeline stage.
+    # Stages must not nest: peak memory is reset at the start of every stage.
+
+    def __init__(self, scope, on_stage=None, track_memory=False, **context):
+        self.scope = scope
+        self.run_id = uuid.uuid4().hex[:8]
+        self.on_stage = on_stage
+        self.track_memory = track_memory
+        self.context = context
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        record = {'stage': name, 'seconds': None, 'rows_in': rows_in, 'rows_out': None, 'peak_mb': None}
+        if self.on_stage: self.on_stage('start', name, self)
+        if self.track_memory:
+            _start_tracing()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 4)
+            if self.track_memory:
+                record['peak_mb'] = round((tracemalloc.get_traced_memory()[1] - base) / 1e6, 2)
+                _stop_tracing()
+            self.records.append(record)
+            self.log('stage', **record)
+            if self.on_stage: self.on_stage('end', name, self)
+
+    def log(self, event, **fields):
+        logger.info(json.dumps({'event': event, 'scope': self.scope, 'run': self.run_id, **self.context, **fields},
+                               default=str))
+
+    def total_seconds(self):
+        return round(sum(r['seconds'] for r in self.records), 4)
+
+
+class _NoProfiler:
+    def stage(self, name, rows_in=None):
+        return nullcontext({})
+
+    def log(self, event, **fields):
+        pass
+
+
+NULL_PROFILER = _NoProfiler()
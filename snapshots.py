@@ -0,0 +1,138 @@
+import os
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+from processing import version_key
+from spool import write_parquet_chunks
+
+# --- SNAPSHOT STORE SETTINGS ---
+SNAPSHOT_DIR = os.environ.get("FLEET_SNAPSHOT_DIR", "snapshots")
+
+# Datasets under the store root, each partitioned by day as <dataset>/date=YYYY-MM-DD/part.parquet.
+# Trend queries only ever read the two *_rollup datasets.
+FLEETS_DATASET = 'fleets'
+COMM_ROLLUP = 'comm_rollup'
+FW_ROLLUP = 'fw_rollup'
+
+TREND_FREQUENCIES = {'Daily': 'D', 'Weekly': 'W', 'Monthly': 'M'}
+
+
+def communication_rollup(comm_raw):
+    # Status x vendor summary -> one (vendor, status, count) row per non-empty cell
+    long = comm_raw.rename_axis(index='status', columns='vendor').stack().rename('count').reset_index()
+    long = long[long['count'] > 0]
+    return pd.DataFrame({'vendor': long['vendor'].astype(str), 'status': long['status'].astype(str),
+                         'count': long['count'].astype('int64')})
+
+
+def firmware_rollup(fw_raw):
+    long = fw_raw.rename_axis(index='firmware', columns='vendor').stack().rename('count').reset_index()
+    long = long[long['count'] > 0]
+    return pd.DataFrame({'vendor': long['vendor'].astype(str), 'firmware': long['firmware'].astype(str),
+                         'count': long['count'].astype('int64')})
+
+
+def _replace_file(path, write):
+    # Write next to the target and rename over it, so readers never see half a partition
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".part-", suffix=".parquet", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+class SnapshotStore:
+    # Append-only history of processed runs. Each day owns one partition per dataset; ingesting a day
+    # again replaces its partitions, so re-runs and backfills are idempotent.
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+
+    # --- WRITE ---
+    def ingest(self, day, result):
+        written = []
+        if result.get('comm_raw') is not None:
+            rollup = communication_rollup(result['comm_raw'])
+            _replace_file(self._partition(COMM_ROLLUP, day), lambda p: rollup.to_parquet(p, index=False))
+            written.append(COMM_ROLLUP)
+        if result.get('fw_raw') is not None:
+            rollup = firmware_rollup(result['fw_raw'])
+            _replace_file(self._partition(FW_ROLLUP, day), lambda p: rollup.to_parquet(p, index=False))
+            written.append(FW_ROLLUP)
+        if result.get('detailed_comm_file') is not None:
+            _replace_file(self._partition(FLEETS_DATASET, day),
+                          lambda p: write_parquet_chunks(result['detailed_comm_file'].chunks(), p))
+            written.append(FLEETS_DATASET)
+        elif result.get('detailed_comm_data') is not None:
+            detailed = result['detailed_comm_data'].astype(str)
+            _replace_file(self._partition(FLEETS_DATASET, day), lambda p: detailed.to_parquet(p, index=False))
+            written.append(FLEETS_DATASET)
+        return written
+
+    # --- READ ---
+    def days(self, dataset=COMM_ROLLUP):
+        # From the directory listing alone; no partition is opened
+        path = os.path.join(self.root, dataset)
+        if not os.path.isdir(path):
+            return []
+        found = []
+        for name in os.listdir(path):
+            if name.startswith('date=') and os.path.exists(os.path.join(path, name, 'part.parquet')):
+                try:
+                    found.append(date.fromisoformat(name[len('date='):]))
+                except ValueError:
+                    continue
+        return sorted(found)
+
+    def read(self, dataset, since=None, until=None):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        path = os.path.join(self.root, dataset)
+        if not self.days(dataset):
+            return pd.DataFrame(columns=['date'])
+        parts = ds.dataset(path, format='parquet', exclude_invalid_files=True,
+                           partitioning=ds.partitioning(pa.schema([('date', pa.date32())]), flavor='hive'))
+        condition = None
+        for bound in ([ds.field('date') >= since] if since else []) + ([ds.field('date') <= until] if until else []):
+            condition = bound if condition is None else condition & bound
+        df = parts.to_table(filter=condition).to_pandas()
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    # --- TREND QUERIES (rollups only) ---
+    def communication_trend(self, freq='D', since=None, until=None, vendors=None):
+        # Share of fleets communicating per period and vendor (fleet-days weighted), plus an 'All Vendors' line
+        df = self.read(COMM_ROLLUP, since, until)
+        if df.empty:
+            return pd.DataFrame()
+        if vendors:
+            df = df[df['vendor'].isin(vendors)]
+        df = df.assign(period=df['date'].dt.to_period(freq).dt.start_time,
+                       comm=df['count'].where(df['status'] == 'Communication', 0))
+        by_vendor = df.groupby(['period', 'vendor'])[['comm', 'count']].sum()
+        rate = (by_vendor['comm'] / by_vendor['count']).unstack('vendor')
+        overall = df.groupby('period')[['comm', 'count']].sum()
+        rate['All Vendors'] = overall['comm'] / overall['count']
+        return rate.rename_axis(index='Period', columns='Vendor')
+
+    def firmware_rollout(self, freq='D', since=None, until=None, vendors=None):
+        # Share of fleets on each firmware version per period
+        df = self.read(FW_ROLLUP, since, until)
+        if df.empty:
+            return pd.DataFrame()
+        if vendors:
+            df = df[df['vendor'].isin(vendors)]
+        df = df.assign(period=df['date'].dt.to_period(freq).dt.start_time)
+        counts = df.groupby(['period', 'firmware'])['count'].sum().unstack('firmware', fill_value=0)
+        counts = counts[sorted(counts.columns, key=version_key)]
+        return counts.div(counts.sum(axis=1), axis=0).rename_axis(index='Period', columns='Firmware Version')
+
+    def _partition(self, dataset, day):
+        return os.path.join(self.root, dataset, f"date={day.isoformat()}", 'part.parquet')
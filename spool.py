@@ -0,0 +1,54 @@
+import os
+import tempfile
+import weakref
+
+import pandas as pd
+
+from ingest import CHUNK_ROWS
+
+# --- SPOOL FILES ---
+# Temporary files of the streaming path and the exports, and the chunked writes between them
+
+
+class SpoolFile:
+    # Temporary file (under FLEET_SPOOL_DIR when set) that goes away with the last reference
+
+    def __init__(self, prefix, suffix, spool_dir=None):
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=suffix,
+                                         dir=spool_dir or os.environ.get("FLEET_SPOOL_DIR"))
+        os.close(fd)
+        weakref.finalize(self, _remove_file, self.path)
+
+    def read_bytes(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def csv_chunks(path, chunksize=CHUNK_ROWS):
+    # Read back as text, so every chunk has the same columns and types
+    return pd.read_csv(path, dtype=str, chunksize=chunksize)
+
+
+def write_parquet_chunks(chunks, sink):
+    # One Parquet file (path or binary stream) from a sequence of frames, one row group per chunk
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            # One text schema for every chunk, whichever path produced the list
+            table = pa.Table.from_pandas(chunk.astype(str), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from cache import ResultCache
+
+
+def make_result(i):
+    return {'comm_raw': pd.DataFrame({'Acme': [i]}), 'all_vendors_list': ['Acme']}
+
+
+def test_put_keeps_new_entry_when_others_are_leased():
+    cache = ResultCache(max_entries=2)
+    leases = []
+    for key in (1, 2):
+        cache.put(key, make_result(key))
+        leases.append(cache.lease(key))
+
+    cache.put(3, make_result(3))
+
+    # The new entry can still be leased; the least recently used leased entry made room
+    lease = cache.lease(3)
+    assert lease is not None
+    assert cache.get(3)['comm_raw'].iloc[0, 0] == 3
+    assert cache.get(1) is None
+    assert cache.get(2) is not None
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+
+def test_unleased_entries_are_evicted_first():
+    cache = ResultCache(max_entries=2)
+    cache.put(1, make_result(1))
+    held = cache.lease(1)
+    cache.put(2, make_result(2))
+
+    cache.put(3, make_result(3))
+
+    assert held is not None
+    assert cache.get(1) is not None
+    assert cache.get(2) is None
+    assert cache.get(3) is not None
@@ -0,0 +1,30 @@
+import io
+import zipfile
+from datetime import date, datetime
+
+import pandas as pd
+
+from export import export_bundle
+from processing import run_analysis
+
+
+def mixed_firmware_result():
+    # openpyxl reads a version like 9.1 as a float, while 1.0.3 stays text
+    dashboard = pd.DataFrame({
+        'Fleet Number': [1, 2, 3],
+        'Device Vendor': ['Acme', 'Acme', 'Beta'],
+        'Last Updated': [datetime(2026, 10, 17), datetime(2026, 10, 10), None],
+        'Firmware Version': pd.Series([9.1, '1.0.3', 10.2], dtype=object),
+    })
+    maintenance = pd.DataFrame({'Fleet Number': [3]})
+    return run_analysis(dashboard, maintenance, maintenance, maintenance, True, True, date(2026, 10, 17))
+
+
+def test_parquet_bundle_with_mixed_firmware_labels():
+    bundle = export_bundle(mixed_firmware_result(), 'parquet')
+
+    with zipfile.ZipFile(bundle.path) as zf:
+        firmware = pd.read_parquet(io.BytesIO(zf.read('Firmware_Summary.parquet')))
+        detailed = pd.read_parquet(io.BytesIO(zf.read('Detailed_Fleet_Status.parquet')))
+    assert firmware['Firmware Version'].tolist() == ['1.0.3', '9.1', '10.2', 'Total']
+    assert len(detailed) == 3
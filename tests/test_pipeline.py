@@ -0,0 +1,139 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from processing import run_analysis, run_analysis_streaming, version_key
+
+AS_OF = date(2026, 10, 17)
+FLEET_COLUMN = 'Fleet Number'
+VENDOR_COLUMN = 'Device Vendor'
+DATE_COLUMN = 'Last Updated'
+FW_COLUMN = 'Firmware Version'
+
+
+# --- REFERENCE: the original row-wise implementation (apply + priority sort) ---
+def original_analysis(df_dash, df_rebody, df_fm, df_sheddown, current_date):
+    previous_date = current_date - timedelta(days=1)
+    priority_map = {'Sheddown': 3, 'Field Maintenance': 2, 'Rebody Renovation': 1}
+    status_order = ['Communication', 'No Communication', 'Rebody Renovation', 'Field Maintenance', 'Sheddown']
+
+    df_dash_comm = df_dash[[FLEET_COLUMN, VENDOR_COLUMN, DATE_COLUMN]].copy()
+    df_rebody = df_rebody[[FLEET_COLUMN]].assign(Category='Rebody Renovation')
+    df_fm = df_fm[[FLEET_COLUMN]].assign(Category='Field Maintenance')
+    df_sheddown = df_sheddown[[FLEET_COLUMN]].assign(Category='Sheddown')
+    for df in [df_dash_comm, df_rebody, df_fm, df_sheddown]:
+        df[FLEET_COLUMN] = df[FLEET_COLUMN].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+
+    df_all_red = pd.concat([df_rebody, df_fm, df_sheddown], ignore_index=True)
+    df_all_red['Priority_Score'] = df_all_red['Category'].map(priority_map)
+    df_red_master = df_all_red.sort_values('Priority_Score', ascending=False).drop_duplicates(
+        subset=[FLEET_COLUMN], keep='first')
+
+    df_dash_comm[DATE_COLUMN] = pd.to_datetime(df_dash_comm[DATE_COLUMN], errors='coerce')
+    df_dash_comm['Last Updated Date'] = df_dash_comm[DATE_COLUMN].dt.date
+    is_comm = (df_dash_comm['Last Updated Date'] == current_date) | (
+            df_dash_comm['Last Updated Date'] == previous_date)
+
+    df_merged = pd.merge(df_dash_comm, df_red_master[[FLEET_COLUMN, 'Category']], on=FLEET_COLUMN, how='left')
+    df_merged['Final Status'] = df_merged.apply(lambda row: 'Communication' if is_comm[row.name] else (
+        row['Category'] if pd.notna(row['Category']) else 'No Communication'), axis=1)
+
+    detailed = df_merged[[FLEET_COLUMN, 'Final Status', VENDOR_COLUMN]].copy()
+    detailed.columns = ['Fleet Number', 'Status', 'Vendor']
+    comm_summ = pd.pivot_table(df_merged, index='Final Status', columns=VENDOR_COLUMN, aggfunc='size', fill_value=0)
+    comm_summ = comm_summ.reindex(status_order, fill_value=0)
+    fw_summ = pd.pivot_table(df_dash[[VENDOR_COLUMN, FW_COLUMN]], index=FW_COLUMN, columns=VENDOR_COLUMN,
+                             aggfunc='size', fill_value=0)
+    # Firmware rows are listed in version order now (9.1 before 10.2)
+    fw_summ = fw_summ.loc[sorted(fw_summ.index, key=version_key)]
+    return detailed, comm_summ, fw_summ
+
+
+# --- DATA ---
+def make_exports(n, seed, fleet_kind):
+    rng = np.random.default_rng(seed)
+    numbers = rng.integers(100000, 100000 + n, n).astype(float)
+    numbers[rng.random(n) < 0.02] = np.nan
+    if fleet_kind == 'float':
+        fleets = pd.Series(numbers)
+    elif fleet_kind == 'string':
+        fleets = pd.Series([f" {int(x)} " if x == x else None for x in numbers], dtype=object)
+    else:
+        # The same fleet spelled as int, float, "123.0" and padded text across rows
+        spellings = [lambda x: int(x), lambda x: x, lambda x: f"{int(x)}.0", lambda x: f" {int(x)}"]
+        fleets = pd.Series([spellings[i % 4](x) if x == x else None for i, x in enumerate(numbers)], dtype=object)
+
+    dates = pd.Series(pd.Timestamp(AS_OF) - pd.to_timedelta(rng.integers(0, 5, n), 'D')
+                      + pd.to_timedelta(rng.integers(0, 86400, n), 's'))
+    dates[rng.random(n) < 0.02] = pd.NaT
+    vendors = pd.Series(rng.choice(np.array(['Acme', ' Beta', 'Zeta', '', None], dtype=object), n), dtype=object)
+    firmware = pd.Series(rng.choice(np.array(['1.0.3', '9.1', '10.2', None], dtype=object), n), dtype=object)
+    # No "1.0.3" in the first half: CSV chunks there read the versions as floats unless told otherwise
+    firmware[:n // 2] = rng.choice(np.array(['9.1', '10.2', None], dtype=object), n // 2)
+    dashboard = pd.DataFrame({FLEET_COLUMN: fleets, VENDOR_COLUMN: vendors, DATE_COLUMN: dates,
+                              FW_COLUMN: firmware})
+
+    def maintenance(size):
+        picked = pd.Series(rng.choice(numbers[numbers == numbers], size))
+        return pd.DataFrame({FLEET_COLUMN: picked if fleet_kind == 'float' else picked.map(lambda x: str(int(x)))})
+    return dashboard, maintenance(n // 8), maintenance(n // 8), maintenance(n // 8)
+
+
+def _text(df):
+    # Missing values of either implementation compare as empty text
+    return df.astype(object).where(df.notna(), '').astype(str).reset_index(drop=True)
+
+
+def assert_same_table(got, expected):
+    assert list(got.index) == list(expected.index)
+    assert [str(c) for c in got.columns] == [str(c) for c in expected.columns]
+    np.testing.assert_array_equal(got.to_numpy(), expected.to_numpy())
+
+
+@pytest.mark.parametrize('fleet_kind', ['float', 'string', 'mixed'])
+def test_run_analysis_matches_original(fleet_kind):
+    dashboard, rebody, fm, sheddown = make_exports(3000, 7, fleet_kind)
+    detailed, comm, fw = original_analysis(dashboard, rebody, fm, sheddown, AS_OF)
+
+    result = run_analysis(dashboard, rebody, fm, sheddown, True, True, AS_OF)
+
+    pd.testing.assert_frame_equal(_text(result['detailed_comm_data']), _text(detailed))
+    assert_same_table(result['comm_raw'], comm)
+    assert_same_table(result['fw_raw'], fw)
+
+
+@pytest.mark.parametrize('fleet_kind', ['float', 'string', 'mixed'])
+def test_streaming_matches_original(tmp_path, fleet_kind):
+    dashboard, rebody, fm, sheddown = make_exports(3000, 11, fleet_kind)
+    path = tmp_path / 'dashboard.csv'
+    dashboard.to_csv(path, index=False)
+    # The reference reads the same CSV, so both see the same parsed cells
+    detailed, comm, fw = original_analysis(pd.read_csv(path), rebody, fm, sheddown, AS_OF)
+
+    result = run_analysis_streaming(str(path), rebody, fm, sheddown, True, True, AS_OF, chunksize=700)
+
+    streamed = result['detailed_comm_file']
+    assert streamed.rows == len(dashboard)
+    pd.testing.assert_frame_equal(_text(pd.concat(streamed.chunks())), _text(detailed))
+    assert_same_table(result['comm_raw'], comm)
+    assert_same_table(result['fw_raw'], fw)
+
+
+def test_empty_maintenance_lists(tmp_path):
+    # Header-only Rebody / Field Maintenance / Sheddown exports: every fleet communicates or not
+    dashboard, *_ = make_exports(3000, 13, 'mixed')
+    empty = pd.DataFrame({FLEET_COLUMN: pd.Series([], dtype=object)})
+    detailed, comm, fw = original_analysis(dashboard, empty, empty, empty, AS_OF)
+
+    result = run_analysis(dashboard, empty, empty, empty, True, True, AS_OF)
+
+    pd.testing.assert_frame_equal(_text(result['detailed_comm_data']), _text(detailed))
+    assert_same_table(result['comm_raw'], comm)
+    assert set(result['detailed_comm_data']['Status']) == {'Communication', 'No Communication'}
+
+    path = tmp_path / 'dashboard.csv'
+    dashboard.to_csv(path, index=False)
+    streamed = run_analysis_streaming(str(path), empty, empty, empty, True, False, AS_OF, chunksize=700)
+    assert_same_table(streamed['comm_raw'], original_analysis(pd.read_csv(path), empty, empty, empty, AS_OF)[1])
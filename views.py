@@ -0,0 +1,95 @@
+import pandas as pd
+
+# --- SUMMARY TABLE & CHART BUILDERS (no Streamlit calls) ---
+# plotly.express is imported by the chart builders, so pages without charts never load it
+SORT_OPTIONS = ["Default (Vendor Name)", "Total Count (High → Low)", "Total Count (Low → High)"]
+APPLE_COLORS = ['#34c759', '#ff3b30', '#ff9f0a', '#0071e3', '#af52de', '#5856d6', '#ff2d55']
+
+
+def summary_table(raw_df, selected_vendors, drop_zeros=False):
+    filtered_df = raw_df[selected_vendors].copy()
+    if drop_zeros:
+        row_sums = filtered_df.sum(axis=1)
+        filtered_df = filtered_df[row_sums > 0]
+
+    filtered_df.loc['Total'] = filtered_df.sum(axis=0)
+    return filtered_df
+
+
+def style_summary(filtered_df):
+    return filtered_df.style.set_properties(**{
+        'background-color': 'white', 'color': '#1d1d1f', 'border-bottom': '1px solid #d2d2d7',
+        'font-family': 'sans-serif', 'font-size': '14px', 'text-align': 'center'
+    }).set_table_styles([
+        {'selector': 'th', 'props': [('background-color', '#F5F5F7'), ('color', '#1d1d1f'), ('font-weight', '600'),
+                                     ('border-bottom', '2px solid #d2d2d7'), ('padding', '12px')]},
+        {'selector': 'td', 'props': [('padding', '10px')]},
+        {'selector': 'tr:last-child',
+         'props': [('font-weight', 'bold'), ('background-color', '#f2f2f7'), ('color', '#0071e3')]}
+    ])
+
+
+def window_comparison(summaries):
+    # {window days: communication summary} -> communicating fleets and their share per vendor, one column pair per window
+    columns = {}
+    for days, table in summaries.items():
+        table = table.assign(**{'All Vendors': table.sum(axis=1)})
+        communicating = table.loc['Communication']
+        columns[f"Within {days}d"] = communicating
+        columns[f"Within {days}d %"] = (communicating / table.sum(axis=0).where(lambda t: t > 0)).fillna(0)
+    return pd.DataFrame(columns).rename_axis(index='Device Vendor')
+
+
+def chart_data(table_df, row_index_col):
+    chart_source = table_df.drop(index='Total')
+    return chart_source.reset_index().melt(id_vars=row_index_col, var_name='Device Vendor', value_name='Count')
+
+
+def build_figure(chart_df, row_index_col, sort_order):
+    import plotly.express as px
+
+    fig = px.bar(chart_df, x='Device Vendor', y='Count', color=row_index_col, barmode='group', text_auto=True,
+                 color_discrete_sequence=APPLE_COLORS)
+
+    # Apply Sorting
+    if sort_order == "Total Count (High → Low)":
+        fig.update_layout(xaxis={'categoryorder': 'total descending'})
+    elif sort_order == "Total Count (Low → High)":
+        fig.update_layout(xaxis={'categoryorder': 'total ascending'})
+
+    # --- UPDATED LAYOUT: NORMAL HEIGHT ON WEB, BIG MARGINS ---
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="-apple-system, sans-serif", size=14, color="#1d1d1f"),
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.2,  # Moved Legend below
+            xanchor="center",
+            x=0.5
+        ),
+        # Increase margins to prevent cutting (especially bottom)
+        margin=dict(l=40, r=40, t=40, b=100)
+    )
+
+    fig.update_traces(marker_cornerradius=10)
+    return fig
+
+
+def build_trend_figure(trend_df, series_name, stacked=False):
+    # Period x series shares from the snapshot store, drawn as lines (or stacked areas for rollouts)
+    import plotly.express as px
+
+    chart_df = trend_df.reset_index().melt(id_vars='Period', var_name=series_name, value_name='Share')
+    plot = px.area if stacked else px.line
+    fig = plot(chart_df, x='Period', y='Share', color=series_name, color_discrete_sequence=APPLE_COLORS)
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="-apple-system, sans-serif", size=14, color="#1d1d1f"),
+        yaxis=dict(tickformat='.0%', range=[0, 1]),
+        legend=dict(orientation="h", yanchor="top", y=-0.2, xanchor="center", x=0.5),
+        margin=dict(l=40, r=40, t=40, b=100)
+    )
+    return fig